@@ -1,16 +1,110 @@
 import sys
 import os
+import threading
+import time
+import fitz
 import streamlit as st
 import json
-import re
 
 # ✅ Add backend directory to Python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from backend.extractor import extract_text
-from backend.ocr import extract_text_from_image
+from backend.cache import hash_bytes
+from backend.extractor import iter_text_chunks, join_chunks
+from backend.ocr import ocr_image_data
 from backend.metadata_gen import generate_metadata
 
+PROGRESS_POLL_SECONDS = 0.2
+
+class ExtractionJob:
+    """
+    Text extraction for one upload, run on a background thread
+
+    Streamlit reruns the whole script on every interaction, so the job lives
+    in st.session_state keyed by the upload's hash: reruns (including the
+    Generate Metadata click) reuse its result instead of extracting again,
+    and a rerun during a long OCR job just resumes polling its progress.
+    """
+
+    def __init__(self, file_hash, name, mime_type, data):
+        self.file_hash = file_hash
+        self.name = name
+        self.pages = None  # PDF page count, when known
+        self.pages_done = 0
+        self.chunks_done = 0
+        self.text = None
+        self.error = None
+        self._thread = threading.Thread(
+            target=self._run, args=(mime_type, data), name=f"extract-{file_hash[:12]}", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, mime_type, data):
+        file_path = None
+        try:
+            if mime_type.startswith("image/"):
+                # Images are OCR'd straight from the upload buffer
+                self.text = ocr_image_data(data)
+                return
+            
+            # ✅ Save to temporary folder (prefixed by hash so concurrent sessions don't collide)
+            os.makedirs("app/temp", exist_ok=True)
+            file_path = os.path.join("app/temp", f"{self.file_hash[:16]}_{self.name}")
+            with open(file_path, "wb") as f:
+                f.write(data)
+            
+            ext = os.path.splitext(file_path)[-1].lower()
+            if ext == ".pdf":
+                with fitz.open(file_path) as doc:
+                    self.pages = len(doc)
+            
+            chunks = []
+            for chunk in iter_text_chunks(file_path):
+                chunks.append(chunk)
+                self.chunks_done += 1
+                if chunk.page:
+                    self.pages_done = chunk.page
+                elif chunk.source == "cache" and self.pages:
+                    self.pages_done = self.pages
+            self.text = join_chunks(chunks, ext)
+        except Exception as e:
+            self.error = e
+        finally:
+            # ✅ Clean up temporary file
+            if file_path and os.path.exists(file_path):
+                try:
+                    os.remove(file_path)
+                except:
+                    pass  # Ignore cleanup errors
+
+    @property
+    def done(self):
+        return not self._thread.is_alive()
+
+    def progress(self):
+        """
+        Fraction complete and a status line for the progress bar
+        """
+        if self.pages:
+            return self.pages_done / self.pages, f"Extracting text: page {self.pages_done} of {self.pages}"
+        if self.chunks_done:
+            return 0.0, f"Extracting text: {self.chunks_done} section(s) read"
+        return 0.0, "Extracting text from document..."
+
+def wait_for_extraction(job):
+    """
+    Show a live progress bar until the background extraction finishes
+    """
+    if job.done:
+        return
+    fraction, status = job.progress()
+    bar = st.progress(fraction, text=status)
+    while not job.done:
+        time.sleep(PROGRESS_POLL_SECONDS)
+        fraction, status = job.progress()
+        bar.progress(min(fraction, 1.0), text=status)
+    bar.empty()
+
 # ✅ Set page config
 st.set_page_config(page_title="SmartMeta: AI Metadata Generator", layout="wide")
 st.title("📄 SmartMeta: Automated Metadata Generation using GenAI")
@@ -36,20 +130,19 @@ if uploaded_file:
     # ✅ Display file info
     st.info(f"**File:** {uploaded_file.name} | **Size:** {uploaded_file.size:,} bytes")
     
-    # ✅ Save to temporary folder
-    os.makedirs("app/temp", exist_ok=True)
-    file_path = os.path.join("app/temp", uploaded_file.name)
-    
     try:
-        with open(file_path, "wb") as f:
-            f.write(uploaded_file.getbuffer())
+        # ✅ Extract text once per upload; reruns reuse the session's job
+        file_hash = hash_bytes(uploaded_file.getvalue())
+        job = st.session_state.get("extraction")
+        if job is None or job.file_hash != file_hash:
+            job = ExtractionJob(file_hash, uploaded_file.name, uploaded_file.type, uploaded_file.getvalue())
+            st.session_state["extraction"] = job
+            st.session_state.pop("metadata", None)
         
-        # ✅ Extract text from file
-        with st.spinner("Extracting text from document..."):
-            if uploaded_file.type.startswith("image/"):
-                text = extract_text_from_image(file_path)
-            else:
-                text = extract_text(file_path)
+        wait_for_extraction(job)
+        if job.error:
+            raise job.error
+        text = job.text
         
         # ✅ Check if text extraction was successful
         if not text or len(text.strip()) < 10:
@@ -77,96 +170,65 @@ if uploaded_file:
             else:
                 with st.spinner("🤖 Analyzing document with GenAI..."):
                     try:
-                        raw_output = generate_metadata(text)
-                        
-                        # ✅ Parse JSON response
-                        try:
-                            # Try to extract JSON from response
-                            json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', raw_output, re.DOTALL | re.IGNORECASE)
-                            
-                            if json_match:
-                                json_str = json_match.group(1)
-                            else:
-                                # Try to find JSON without code blocks
-                                json_match = re.search(r'(\{.*\})', raw_output, re.DOTALL)
-                                if json_match:
-                                    json_str = json_match.group(1)
-                                else:
-                                    raise ValueError("No JSON found in response")
-                            
-                            # Parse the JSON
-                            metadata = json.loads(json_str)
-                            
-                            # ✅ Display metadata in organized format
-                            st.subheader("📊 Generated Metadata")
-                            
-                            # Create tabs for better organization
-                            tab1, tab2, tab3 = st.tabs(["📋 Overview", "🏷️ Details", "📥 Download"])
-                            
-                            with tab1:
-                                col1, col2 = st.columns(2)
-                                
-                                with col1:
-                                    if 'title' in metadata:
-                                        st.metric("Title", metadata['title'])
-                                    if 'document_category' in metadata:
-                                        st.metric("Category", metadata['document_category'])
-                                    if 'language' in metadata:
-                                        st.metric("Language", metadata['language'])
-                                    if 'sentiment' in metadata:
-                                        st.metric("Sentiment", metadata['sentiment'])
-                                
-                                with col2:
-                                    if 'author' in metadata:
-                                        st.metric("Author", metadata['author'])
-                                    if 'estimated_reading_time' in metadata:
-                                        st.metric("Reading Time", f"{metadata['estimated_reading_time']} min")
-                                    if 'confidential' in metadata:
-                                        st.metric("Confidential", metadata['confidential'])
-                                
-                                if 'summary' in metadata:
-                                    st.subheader("📝 Summary")
-                                    st.write(metadata['summary'])
-                            
-                            with tab2:
-                                st.json(metadata)
-                            
-                            with tab3:
-                                # ✅ Download button
-                                json_bytes = json.dumps(metadata, indent=4).encode('utf-8')
-                                st.download_button(
-                                    "⬇️ Download Metadata JSON",
-                                    data=json_bytes,
-                                    file_name=f"metadata_{uploaded_file.name}.json",
-                                    mime="application/json"
-                                )
-                                
-                                # Option to copy to clipboard
-                                st.code(json.dumps(metadata, indent=2), language="json")
-                                
-                        except json.JSONDecodeError as e:
-                            st.error(f"❌ Failed to parse JSON response: {str(e)}")
-                            st.subheader("🔍 Raw API Response")
-                            st.text_area("Debug Output", value=raw_output, height=300)
-                        
-                        except Exception as e:
-                            st.error(f"❌ Error processing metadata: {str(e)}")
-                            st.subheader("🔍 Raw API Response")
-                            st.text_area("Debug Output", value=raw_output, height=300)
-                    
+                        # ✅ Validated metadata (malformed model output is repaired by the backend)
+                        st.session_state["metadata"] = (file_hash, generate_metadata(text).to_dict())
                     except Exception as e:
                         st.error(f"❌ Failed to generate metadata: {str(e)}")
+        
+        # ✅ Kept in session state so reruns (e.g. the download click) still show it
+        stored = st.session_state.get("metadata")
+        if stored and stored[0] == file_hash:
+            metadata = stored[1]
+            
+            # ✅ Display metadata in organized format
+            st.subheader("📊 Generated Metadata")
+            
+            # Create tabs for better organization
+            tab1, tab2, tab3 = st.tabs(["📋 Overview", "🏷️ Details", "📥 Download"])
+            
+            with tab1:
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    if 'title' in metadata:
+                        st.metric("Title", metadata['title'])
+                    if 'document_category' in metadata:
+                        st.metric("Category", metadata['document_category'])
+                    if 'language' in metadata:
+                        st.metric("Language", metadata['language'])
+                    if 'sentiment' in metadata:
+                        st.metric("Sentiment", metadata['sentiment'])
+                
+                with col2:
+                    if 'author' in metadata:
+                        st.metric("Author", metadata['author'])
+                    if 'estimated_reading_time' in metadata:
+                        st.metric("Reading Time", f"{metadata['estimated_reading_time']} min")
+                    if 'confidential' in metadata:
+                        st.metric("Confidential", metadata['confidential'])
+                
+                if 'summary' in metadata:
+                    st.subheader("📝 Summary")
+                    st.write(metadata['summary'])
+            
+            with tab2:
+                st.json(metadata)
+            
+            with tab3:
+                # ✅ Download button
+                json_bytes = json.dumps(metadata, indent=4).encode('utf-8')
+                st.download_button(
+                    "⬇️ Download Metadata JSON",
+                    data=json_bytes,
+                    file_name=f"metadata_{uploaded_file.name}.json",
+                    mime="application/json"
+                )
+                
+                # Option to copy to clipboard
+                st.code(json.dumps(metadata, indent=2), language="json")
     
     except Exception as e:
         st.error(f"❌ Error processing file: {str(e)}")
-    
-    finally:
-        # ✅ Clean up temporary file
-        if os.path.exists(file_path):
-            try:
-                os.remove(file_path)
-            except:
-                pass  # Ignore cleanup errors
 
 else:
     # ✅ Show instructions when no file is uploaded
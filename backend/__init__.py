@@ -0,0 +1,4 @@
+from dotenv import load_dotenv
+
+# Load .env here, before any backend module reads its configuration at import time
+load_dotenv()
@@ -0,0 +1,284 @@
+import re
+import math
+import logging
+import unicodedata
+from collections import Counter
+
+try:
+    from langid.langid import LanguageIdentifier, model as langid_model
+except ImportError:
+    LanguageIdentifier = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Metadata fields this module computes without the model
+ANALYTICS_FIELDS = ("word_count", "estimated_reading_time", "language", "important_dates", "keywords")
+
+READING_WPM = 200  # Words per minute for estimated_reading_time
+LANGUAGE_SAMPLE_CHARS = 20000  # Language ID looks at the start of the document only
+MIN_LANGUAGE_HITS = 3  # Stopword hits needed before the fallback detector names a language
+MIN_LANGUAGE_PROBABILITY = 0.9  # langid's normalized probability needed before its answer is used
+KEYWORD_COUNT = 5
+MIN_KEYWORD_CHARS = 3
+MAX_DATES = 10
+
+# Markers the extractors add for content that is not plain body text
+_TABLE_MARKER = "[Tables Content]"
+_OCR_MARKER = re.compile(r"^\[(?:OCR-Extracted Text|Page \d+ OCR)\]$", re.MULTILINE)
+_EXTRACTOR_MARKER = re.compile(r"^(?:--- Page \d+ ---|\[Page \d+ OCR\]|\[OCR-Extracted Text\]|\[Tables Content\])$", re.MULTILINE)
+
+_WORD = re.compile(r"\w+(?:['’]\w+)*")
+_SEGMENT_BREAK = re.compile(r"\n\s*\n|^--- Page \d+ ---$", re.MULTILINE)
+
+# Frequent function words, used both to identify the language and to filter keyword candidates
+STOPWORDS = {
+    "English": set("""
+        a about above after again against all also am an and any are as at be because been before being
+        below between both but by can could did do does doing down during each few for from further had
+        has have having he her here hers herself him himself his how i if in into is it its itself just
+        me more most my myself no nor not now of off on once only or other our ours ourselves out over own
+        same she should so some such than that the their theirs them themselves then there these they
+        this those through to too under until up very was we were what when where which while who whom
+        why will with would you your yours yourself yourselves may might must shall upon within without
+        however therefore thus whether among via per page
+    """.split()),
+    "Spanish": set("""
+        de la que el en y a los del se las por un para con no una su al lo como más pero sus le ya o este
+        sí porque esta entre cuando muy sin sobre también me hasta hay donde quien desde todo nos durante
+        todos uno les ni contra otros ese eso ante ellos e esto mí antes algunos qué unos yo otro otras
+        otra él tanto esa estos mucho quienes nada muchos cual poco ella estar estas algunas algo nosotros
+        es son fue ser está han
+    """.split()),
+    "French": set("""
+        au aux avec ce ces dans de des du elle en et eux il je la le les leur lui ma mais me même mes moi
+        mon ne nos notre nous on ou par pas pour qu que qui sa se ses son sur ta te tes toi ton tu un une
+        vos votre vous c d j l à m n s t y été être est sont était ont avait cette comme plus aussi sans
+    """.split()),
+    "German": set("""
+        aber alle als also am an auch auf aus bei bin bis bist da damit dann das dass dem den der des die
+        dies diese dieser dieses doch dort du durch ein eine einem einen einer eines er es für hat hatte
+        hier ich ihr ihre im in ist ja jede jedem jeden jeder kann kein keine mit muss nach nicht noch nun
+        nur ob oder sich sie sind so über um und uns unter vom von vor war waren was weil wenn werden wie
+        wir wird wurde zu zum zur zwischen
+    """.split()),
+    "Italian": set("""
+        il lo la i gli le di da in con su per tra fra un uno una e ed o ma se che chi cui non più come
+        anche questo questa questi queste quello quella del della dei delle degli al alla ai alle agli
+        dal dalla nel nella nei sul sulla è sono era essere ha hanno stato molto tutto tutti
+    """.split()),
+    "Portuguese": set("""
+        de a o que e do da em um para é com não uma os no se na por mais as dos como mas foi ao ele das
+        tem à seu sua ou ser quando muito há nos já está eu também só pelo pela até isso ela entre era
+        depois sem mesmo aos ter seus quem nas me esse eles estão você essa num nem suas meu às minha
+    """.split()),
+    "Dutch": set("""
+        de en van ik te dat die in een hij het niet zijn is was op aan met als voor had er maar om hem dan
+        zou of wat mijn men dit zo door over ze zich bij ook tot je mij uit der daar haar naar heb hoe heeft
+        hebben deze u want nog zal me zij nu ge geen omdat iets worden toch al waren veel meer doen
+    """.split()),
+}
+_ALL_STOPWORDS = set().union(*STOPWORDS.values())
+
+# Languages written in their own script, recognised from the characters alone
+_SCRIPT_LANGUAGES = (
+    ("HIRAGANA", "Japanese"),
+    ("KATAKANA", "Japanese"),
+    ("HANGUL", "Korean"),
+    ("CJK", "Chinese"),
+    ("CYRILLIC", "Russian"),
+    ("ARABIC", "Arabic"),
+    ("HEBREW", "Hebrew"),
+    ("DEVANAGARI", "Hindi"),
+    ("GREEK", "Greek"),
+    ("THAI", "Thai"),
+)
+
+# ISO 639-1 codes returned by langid, mapped to the names the model uses
+LANGUAGE_NAMES = {
+    "en": "English", "es": "Spanish", "fr": "French", "de": "German", "it": "Italian",
+    "pt": "Portuguese", "nl": "Dutch", "ru": "Russian", "zh": "Chinese", "ja": "Japanese",
+    "ko": "Korean", "ar": "Arabic", "he": "Hebrew", "hi": "Hindi", "el": "Greek", "th": "Thai",
+    "pl": "Polish", "sv": "Swedish", "da": "Danish", "no": "Norwegian", "fi": "Finnish",
+    "tr": "Turkish", "cs": "Czech", "uk": "Ukrainian", "ro": "Romanian", "hu": "Hungarian",
+}
+
+_MONTHS = (
+    r"(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|June?|July?|Aug(?:ust)?|"
+    r"Sep(?:t(?:ember)?)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)\.?"
+)
+# ISO dates, numeric day/month/year, "12 March 2024", "March 12, 2024" and "March 2024"
+_DATE = re.compile(
+    r"\b(?:"
+    r"(?:19|20)\d\d-(?:0?[1-9]|1[0-2])-(?:0?[1-9]|[12]\d|3[01])"
+    r"|(?:0?[1-9]|[12]\d|3[01])[/.](?:0?[1-9]|1[0-2])[/.](?:19|20)\d\d"
+    r"|(?:0?[1-9]|1[0-2])/(?:0?[1-9]|[12]\d|3[01])/(?:19|20)\d\d"
+    rf"|(?:0?[1-9]|[12]\d|3[01])(?:st|nd|rd|th)?\s+{_MONTHS},?\s+(?:19|20)\d\d"
+    rf"|{_MONTHS}\s+(?:0?[1-9]|[12]\d|3[01])(?:st|nd|rd|th)?,?\s+(?:19|20)\d\d"
+    rf"|{_MONTHS}\s+(?:19|20)\d\d"
+    r")\b",
+    re.IGNORECASE,
+)
+
+def count_words(text):
+    """
+    Number of words in the document, not counting extractor markers
+    """
+    return sum(1 for _ in _WORD.finditer(_EXTRACTOR_MARKER.sub("", text)))
+
+def reading_time(word_count):
+    """
+    Reading time in whole minutes at READING_WPM, at least 1 for any text
+    """
+    return math.ceil(word_count / READING_WPM) if word_count else 0
+
+def _script_language(sample):
+    """
+    Language for text written mostly in a non-Latin script, or None
+    """
+    scripts = Counter()
+    letters = 0
+    for ch in sample:
+        if not ch.isalpha():
+            continue
+        letters += 1
+        if ord(ch) < 0x250:
+            continue
+        name = unicodedata.name(ch, "")
+        for script, language in _SCRIPT_LANGUAGES:
+            if name.startswith(script):
+                scripts[language] += 1
+                break
+    if not scripts or sum(scripts.values()) < letters / 2:
+        return None
+    # Japanese mixes kana with CJK ideographs, so any sizeable share of kana wins
+    if scripts["Japanese"] >= sum(scripts.values()) / 10:
+        return "Japanese"
+    return scripts.most_common(1)[0][0]
+
+_language_identifier = None
+
+def _get_language_identifier():
+    """
+    Shared langid classifier reporting normalized probabilities, loaded on first use
+    """
+    global _language_identifier
+    if _language_identifier is None:
+        _language_identifier = LanguageIdentifier.from_modelstring(langid_model, norm_probs=True)
+    return _language_identifier
+
+def detect_language(text):
+    """
+    Primary language of the text, or "Not specified" when it cannot be told
+
+    Uses langid when installed, trusting it only above MIN_LANGUAGE_PROBABILITY
+    and for languages in LANGUAGE_NAMES; otherwise the script for non-Latin
+    text and stopword frequencies for the common Latin-script languages.
+    """
+    sample = _EXTRACTOR_MARKER.sub("", text[:LANGUAGE_SAMPLE_CHARS])
+    if not sample.strip():
+        return "Not specified"
+    if LanguageIdentifier is not None:
+        code, probability = _get_language_identifier().classify(sample)
+        if probability < MIN_LANGUAGE_PROBABILITY or code not in LANGUAGE_NAMES:
+            return "Not specified"
+        return LANGUAGE_NAMES[code]
+
+    language = _script_language(sample)
+    if language:
+        return language
+    hits = Counter()
+    for word in _WORD.findall(sample.lower()):
+        for language, words in STOPWORDS.items():
+            if word in words:
+                hits[language] += 1
+    if not hits:
+        return "Not specified"
+    language, count = hits.most_common(1)[0]
+    return language if count >= MIN_LANGUAGE_HITS else "Not specified"
+
+def find_dates(text, limit=MAX_DATES):
+    """
+    Dates written out in the text, in order of first appearance without repeats
+    """
+    dates = []
+    seen = set()
+    for match in _DATE.finditer(text):
+        value = " ".join(match.group().split())
+        key = value.lower()
+        if key not in seen:
+            seen.add(key)
+            dates.append(value)
+            if len(dates) == limit:
+                break
+    return dates
+
+def extract_keywords(text, limit=KEYWORD_COUNT):
+    """
+    Top TF-IDF terms, treating each page or paragraph as a document
+
+    Terms spread over many sections of the document rank above terms that
+    are frequent in one place; stopwords, numbers and short tokens are skipped.
+    Each keyword keeps its most common spelling.
+    """
+    segments = [segment for segment in _SEGMENT_BREAK.split(_EXTRACTOR_MARKER.sub("", text)) if segment and segment.strip()]
+    document_frequency = Counter()
+    term_frequency = Counter()
+    spellings = {}
+    for segment in segments:
+        terms = Counter()
+        for word in _WORD.findall(segment):
+            key = word.lower()
+            if len(key) < MIN_KEYWORD_CHARS or key in _ALL_STOPWORDS or not key.isalpha():
+                continue
+            terms[key] += 1
+            spellings.setdefault(key, Counter())[word] += 1
+        document_frequency.update(terms.keys())
+        for key, count in terms.items():
+            term_frequency[key] += 1 + math.log(count)
+
+    total = len(segments)
+    scores = {
+        key: tf * (math.log((1 + total) / (1 + document_frequency[key])) + 1)
+        for key, tf in term_frequency.items()
+    }
+    ranked = sorted(scores, key=lambda key: (-scores[key], key))
+    return [spellings[key].most_common(1)[0][0] for key in ranked[:limit]]
+
+def content_flags(text):
+    """
+    has_tables/has_images as reported by the extractors' section markers
+
+    DOCX tables are extracted under "[Tables Content]" and text OCR'd from
+    images is marked "[OCR-Extracted Text]" or "[Page N OCR]". Only what the
+    extractors saw is reported, so a "No" is not proof of absence.
+    """
+    return {
+        "has_tables": "Yes" if _TABLE_MARKER in text else "No",
+        "has_images": "Yes" if _OCR_MARKER.search(text) else "No",
+    }
+
+def analyze_text(text, names=ANALYTICS_FIELDS):
+    """
+    Compute the requested metadata fields locally, plus the extractor content flags
+
+    Returns a dict of metadata values for ``names`` (a subset of
+    ANALYTICS_FIELDS) with "content_features" holding the flags from
+    content_flags.
+    """
+    values = {}
+    if "word_count" in names or "estimated_reading_time" in names:
+        words = count_words(text)
+        if "word_count" in names:
+            values["word_count"] = words
+        if "estimated_reading_time" in names:
+            values["estimated_reading_time"] = reading_time(words)
+    if "language" in names:
+        values["language"] = detect_language(text)
+    if "important_dates" in names:
+        values["important_dates"] = find_dates(text)
+    if "keywords" in names:
+        values["keywords"] = extract_keywords(text)
+    values["content_features"] = content_flags(text)
+    return values
@@ -0,0 +1,216 @@
+import os
+import sys
+import argparse
+import json
+import logging
+import sqlite3
+import time
+
+from backend.dedup import get_duplicate_index
+from backend.metadata_gen import METADATA_CONCURRENCY, OFFLINE, prompt_stats
+from backend.pipeline import IMAGE_EXTENSIONS, document_pipeline
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DOCUMENT_EXTENSIONS = {".pdf", ".docx", ".txt"}
+SUPPORTED_EXTENSIONS = DOCUMENT_EXTENSIONS | IMAGE_EXTENSIONS
+
+class Checkpoint:
+    """
+    Per-file status store that lets an interrupted batch run resume where it stopped
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                "path TEXT PRIMARY KEY, status TEXT NOT NULL, "
+                "error TEXT, updated_at REAL NOT NULL)"
+            )
+
+    def completed(self, retry_failed=False):
+        """
+        Return the set of paths that should be skipped on this run
+        """
+        statuses = ("done",) if retry_failed else ("done", "failed")
+        placeholders = ", ".join("?" for _ in statuses)
+        rows = self._conn.execute(
+            f"SELECT path FROM files WHERE status IN ({placeholders})", statuses
+        )
+        return {row[0] for row in rows}
+
+    def mark(self, path, status, error=None):
+        """
+        Record the latest status for a file
+        """
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files (path, status, error, updated_at) VALUES (?, ?, ?, ?)",
+                (path, status, error, time.time())
+            )
+
+    def counts(self):
+        return dict(self._conn.execute("SELECT status, COUNT(*) FROM files GROUP BY status"))
+
+    def close(self):
+        self._conn.close()
+
+def iter_input_files(source):
+    """
+    Yield supported files from a directory (recursively) or a manifest file
+
+    A manifest is either a text file with one path per line or a JSONL file whose
+    records have a "path" field. Relative paths resolve against the manifest's folder.
+    """
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if os.path.splitext(name)[-1].lower() in SUPPORTED_EXTENSIONS:
+                    yield os.path.abspath(os.path.join(root, name))
+        return
+
+    base_dir = os.path.dirname(os.path.abspath(source))
+    with open(source, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            path = json.loads(line)["path"] if line.startswith("{") else line
+            yield os.path.abspath(os.path.join(base_dir, path))
+
+def read_recorded(output_path):
+    """
+    Return {path: status} for the records already in a JSONL output file
+
+    A run killed mid-write can leave a partial last line; it is cut off so
+    appended records start on a line of their own.
+    """
+    recorded = {}
+    if not os.path.exists(output_path):
+        return recorded
+    complete_bytes = 0
+    with open(output_path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            complete_bytes += len(line)
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict) and "path" in record:
+                recorded[record["path"]] = record.get("status")
+    if complete_bytes < os.path.getsize(output_path):
+        logger.warning(f"Dropping a partially written record at the end of {output_path}")
+        with open(output_path, "r+b") as f:
+            f.truncate(complete_bytes)
+    return recorded
+
+def run_batch(source, output_path, checkpoint_path=None, extract_workers=None, llm_workers=None, retry_failed=False,
+              offline=None):
+    """
+    Extract text and generate metadata for every file under source, appending JSONL records
+
+    Files flow through document_pipeline, so extraction (process pool) and
+    metadata generation (thread pool) overlap across files with bounded queues
+    in between. Each file's status is checkpointed so a rerun skips finished files;
+    files already recorded in the output also count as finished, since a crash
+    can land between writing a record and checkpointing it.
+    With offline=True records hold only the locally computed metadata fields.
+    """
+    if offline is None:
+        offline = OFFLINE
+    checkpoint = Checkpoint(checkpoint_path or output_path + ".checkpoint.db")
+    skip = checkpoint.completed(retry_failed=retry_failed)
+    for path, status in read_recorded(output_path).items():
+        if path in skip or (status == "failed" and retry_failed):
+            continue
+        checkpoint.mark(path, "done" if status == "ok" else "failed")
+        skip.add(path)
+    pipeline = document_pipeline(extract_workers=extract_workers, llm_workers=llm_workers, offline=offline)
+    
+    pending_files = (path for path in iter_input_files(source) if path not in skip)
+    processed = 0
+    failed = 0
+    start = time.time()
+    
+    logger.info(f"Starting batch: {len(skip)} file(s) already completed, "
+                f"{pipeline.stages[0].workers} extraction worker(s), {pipeline.stages[1].workers} LLM worker(s)")
+    
+    with open(output_path, "a", encoding="utf-8") as output:
+        for path, result, error in pipeline.run(pending_files):
+            if error:
+                stage, exc = error
+                logger.warning(f"{stage} failed for {path}: {str(exc)}")
+                record = {"path": path, "status": "failed", "stage": stage, "error": str(exc)}
+                checkpoint_status = ("failed", str(exc))
+                failed += 1
+            else:
+                record = {"path": path, "status": "ok", **result}
+                checkpoint_status = ("done", None)
+                processed += 1
+            
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output.flush()
+            checkpoint.mark(path, *checkpoint_status)
+            
+            if (processed + failed) % 100 == 0:
+                logger.info(f"Processed {processed + failed} file(s) in {time.time() - start:.0f}s")
+                pipeline.log_stats()
+    
+    pipeline.log_stats()
+    summary = {
+        "processed": processed,
+        "failed": failed,
+        "skipped": len(skip),
+        "seconds": round(time.time() - start, 1),
+        "pipeline": pipeline.stats(),
+        "prompt": prompt_stats.stats(),
+    }
+    index = get_duplicate_index()
+    if index and not offline:
+        summary["duplicates"] = index.stats()
+        logger.info(f"Near-duplicates: {summary['duplicates']['hits']} found, "
+                    f"{summary['duplicates']['documents']} document(s) indexed")
+    logger.info(f"Batch finished: {processed} processed, {failed} failed, {len(skip)} skipped in {summary['seconds']}s")
+    logger.info(f"Prompt tokens: {summary['prompt']['prompt_tokens']} sent, {summary['prompt']['tokens_saved']} saved")
+    checkpoint.close()
+    return summary
+
+def main(argv=None):
+    """
+    Command-line entry point
+    """
+    parser = argparse.ArgumentParser(
+        description="Extract text and generate metadata for a directory or manifest of documents"
+    )
+    parser.add_argument("source", help="Directory to scan recursively, or a manifest file (one path per line or JSONL with a 'path' field)")
+    parser.add_argument("-o", "--output", default="metadata.jsonl", help="JSONL file to append results to (default: metadata.jsonl)")
+    parser.add_argument("--checkpoint", help="Checkpoint database (default: <output>.checkpoint.db)")
+    parser.add_argument("--extract-workers", type=int, help="Extraction processes (default: CPU count)")
+    parser.add_argument("--llm-workers", type=int, help=f"Concurrent metadata requests (default: {METADATA_CONCURRENCY})")
+    parser.add_argument("--retry-failed", action="store_true", help="Reprocess files that failed on a previous run")
+    parser.add_argument("--offline", action="store_true", help="No API calls: write only locally computed fields (word count, reading time, language, dates, keywords, content flags)")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.source):
+        parser.error(f"Source not found: {args.source}")
+
+    summary = run_batch(
+        args.source,
+        args.output,
+        checkpoint_path=args.checkpoint,
+        extract_workers=args.extract_workers,
+        llm_workers=args.llm_workers,
+        retry_failed=args.retry_failed,
+        offline=args.offline or None  # None falls back to METADATA_OFFLINE
+    )
+    return 1 if summary["failed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,373 @@
+import os
+import hashlib
+import json
+import logging
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Bump whenever a change to the extractors alters their output, so stale entries are ignored
+EXTRACTOR_VERSION = "6"
+
+# Extraction cache configuration
+EXTRACTION_CACHE_ENABLED = os.getenv("EXTRACTION_CACHE_ENABLED", "1") == "1"
+EXTRACTION_CACHE_DIR = os.path.expanduser(os.getenv(
+    "EXTRACTION_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "smartmeta", "extraction")
+))
+EXTRACTION_CACHE_MAX_MB = int(os.getenv("EXTRACTION_CACHE_MAX_MB", "512"))
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+def hash_bytes(data):
+    """
+    Return the SHA-256 hex digest of an in-memory buffer
+    """
+    return hashlib.sha256(data).hexdigest()
+
+def hash_file(path):
+    """
+    Return the SHA-256 hex digest of a file, reading it in chunks
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class ExtractionCache:
+    """
+    Content-addressed on-disk cache for extracted text with size-bounded LRU eviction
+    """
+
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._total_bytes = None
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def make_key(self, content_hash, settings):
+        """
+        Combine a content hash with the settings that affect extraction output
+        """
+        settings = dict(settings, version=EXTRACTOR_VERSION)
+        payload = content_hash + json.dumps(settings, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.txt")
+
+    def get(self, key):
+        """
+        Return cached text for key, or None on a miss
+        """
+        path = self._entry_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+        except (FileNotFoundError, UnicodeDecodeError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # Touch the entry so eviction treats it as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        with self._lock:
+            self.hits += 1
+        return text
+
+    def set(self, key, text):
+        """
+        Store text under key, evicting least recently used entries if over budget
+        """
+        path = self._entry_path(key)
+        data = text.encode("utf-8")
+
+        # Write atomically so concurrent readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            previous_size = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not write extraction cache entry: {str(e)}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_size()
+            else:
+                self._total_bytes += len(data) - previous_size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(".txt"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _scan_size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        """
+        Remove least recently used entries until the cache fits its budget
+        """
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                continue
+        self._total_bytes = total
+
+    def clear(self):
+        """
+        Remove all entries and reset counters
+        """
+        with self._lock:
+            for _, _, path in self._entries():
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+            self._total_bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Return hit/miss counters and current cache size
+        """
+        with self._lock:
+            entries = self._entries()
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(entries),
+                "bytes": sum(size for _, size, _ in entries),
+                "max_bytes": self.max_bytes,
+            }
+
+_extraction_cache = None
+
+def get_extraction_cache():
+    """
+    Return the shared extraction cache, or None if caching is disabled
+    """
+    global _extraction_cache
+    if not EXTRACTION_CACHE_ENABLED:
+        return None
+    if _extraction_cache is None:
+        try:
+            _extraction_cache = ExtractionCache(EXTRACTION_CACHE_DIR, EXTRACTION_CACHE_MAX_MB * 1024 * 1024)
+        except Exception as e:
+            logger.warning(f"Extraction cache unavailable: {str(e)}")
+            return None
+    return _extraction_cache
+
+# Metadata response cache configuration
+METADATA_CACHE_ENABLED = os.getenv("METADATA_CACHE_ENABLED", "1") == "1"
+METADATA_CACHE_BACKEND = os.getenv("METADATA_CACHE_BACKEND", "sqlite")  # "sqlite" or "memory"
+METADATA_CACHE_PATH = os.path.expanduser(os.getenv(
+    "METADATA_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "smartmeta", "metadata.db")
+))
+METADATA_CACHE_TTL = int(os.getenv("METADATA_CACHE_TTL", str(7 * 24 * 3600)))  # seconds
+METADATA_CACHE_MAX_ENTRIES = int(os.getenv("METADATA_CACHE_MAX_ENTRIES", "1000"))
+
+class MemoryLRUBackend:
+    """
+    In-process LRU store for cached responses
+    """
+
+    def __init__(self, max_entries=1000):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                self._data.move_to_end(key)
+            return item
+
+    def set(self, key, value, created_at):
+        with self._lock:
+            self._data[key] = (value, created_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+class SQLiteBackend:
+    """
+    Persistent SQLite store for cached responses, shared across processes
+    """
+
+    def __init__(self, path, max_entries=None):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                with self._conn:
+                    self._conn.execute(
+                        "UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key)
+                    )
+            return row
+
+    def set(self, key, value, created_at):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, created_at, created_at)
+            )
+            if self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    "SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+
+    def delete(self, key):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+def normalize_text(text):
+    """
+    Collapse whitespace so trivially different extractions share a cache key
+    """
+    return " ".join(text.split())
+
+class MetadataCache:
+    """
+    TTL cache for LLM metadata responses on top of a pluggable backend
+    """
+
+    def __init__(self, backend, ttl=METADATA_CACHE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def make_key(self, text, **params):
+        """
+        Combine normalized text with the model, prompt version and sampling parameters
+        """
+        payload = json.dumps(
+            {"text": normalize_text(text), "params": params}, sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """
+        Return the cached response for key, or None if missing or expired
+        """
+        item = self.backend.get(key)
+        if item is not None:
+            value, created_at = item
+            if not self.ttl or time.time() - created_at <= self.ttl:
+                with self._lock:
+                    self.hits += 1
+                return value
+            self.backend.delete(key)
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key, value):
+        self.backend.set(key, value, time.time())
+
+    def clear(self):
+        self.backend.clear()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Return hit/miss counters and current entry count
+        """
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        return {"hits": hits, "misses": misses, "entries": len(self.backend)}
+
+_metadata_cache = None
+
+def get_metadata_cache():
+    """
+    Return the shared metadata response cache, or None if caching is disabled
+    """
+    global _metadata_cache
+    if not METADATA_CACHE_ENABLED:
+        return None
+    if _metadata_cache is None:
+        try:
+            if METADATA_CACHE_BACKEND == "memory":
+                backend = MemoryLRUBackend(METADATA_CACHE_MAX_ENTRIES)
+            else:
+                backend = SQLiteBackend(METADATA_CACHE_PATH, METADATA_CACHE_MAX_ENTRIES)
+            _metadata_cache = MetadataCache(backend)
+        except Exception as e:
+            logger.warning(f"Metadata cache unavailable: {str(e)}")
+            return None
+    return _metadata_cache
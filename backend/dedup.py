@@ -0,0 +1,226 @@
+import os
+import re
+import json
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from collections import namedtuple
+
+import numpy as np
+
+from backend.cache import normalize_text
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# "off", "flag" (report the nearest match and what changed) or "reuse" (skip the model for near-duplicates)
+DEDUP_MODE = os.getenv("DEDUP_MODE", "flag")
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.85"))  # Estimated Jaccard similarity of word shingles
+DEDUP_INDEX_PATH = os.path.expanduser(os.getenv(
+    "DEDUP_INDEX_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "smartmeta", "dedup.db")
+))
+
+# MinHash LSH parameters: NUM_PERM = BANDS * ROWS. With 16 bands of 8 rows a pair
+# at similarity 0.8 becomes a candidate ~95% of the time, at 0.5 under 7%.
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_WORDS = 5
+HASH_SEED = 1  # Fixed so signatures stay comparable across processes and runs
+_HASH_BLOCK = 4096  # Shingles hashed per numpy block, bounding memory to ~4 MB
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_WORD = re.compile(r"\w+")
+
+_random = np.random.RandomState(HASH_SEED)
+_PERM_A = _random.randint(1, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _random.randint(0, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)
+
+Match = namedtuple("Match", ["document_id", "similarity", "metadata"])
+
+def document_id(text):
+    """
+    Stable ID for a document's text: SHA-256 of the whitespace-normalized text
+    """
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+def shingles(text, size=SHINGLE_WORDS):
+    """
+    Set of lowercased word n-grams; texts shorter than ``size`` words form one shingle
+    """
+    words = _WORD.findall(text.lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+def minhash(text):
+    """
+    MinHash signature (NUM_PERM uint32 values) of the text's word shingles
+    """
+    hashes = np.fromiter(
+        (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles(text)),
+        dtype=np.uint64
+    )
+    signature = np.full(NUM_PERM, _MAX_HASH, dtype=np.uint64)
+    for start in range(0, len(hashes), _HASH_BLOCK):
+        block = hashes[start:start + _HASH_BLOCK]
+        # Universal hashing (a*x + b) mod p, one row per permutation; uint64 overflow wraps deterministically
+        permuted = (np.outer(_PERM_A, block) + _PERM_B[:, None]) % _MERSENNE_PRIME & _MAX_HASH
+        np.minimum(signature, permuted.min(axis=1), out=signature)
+    return signature.astype(np.uint32)
+
+def similarity(a, b):
+    """
+    Estimated Jaccard similarity of two signatures
+    """
+    return float(np.count_nonzero(a == b)) / len(a)
+
+def diff_metadata(before, after):
+    """
+    Fields whose values differ between two metadata dicts, as {name: {"before": x, "after": y}}
+    """
+    return {
+        name: {"before": before.get(name), "after": value}
+        for name, value in after.items()
+        if before.get(name) != value
+    }
+
+class DuplicateIndex:
+    """
+    Persistent MinHash LSH index of processed documents and their metadata
+
+    Each signature is split into BANDS bands; documents sharing any band
+    bucket are candidates, and candidates are ranked by estimated similarity.
+    Documents are added one at a time, so the index grows incrementally as a
+    batch runs and persists across runs.
+    """
+
+    def __init__(self, path, threshold=DEDUP_THRESHOLD):
+        self.path = path
+        self.threshold = threshold
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS settings (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                "id TEXT PRIMARY KEY, signature BLOB NOT NULL, "
+                "metadata TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS bands ("
+                "band INTEGER NOT NULL, bucket BLOB NOT NULL, id TEXT NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS bands_bucket ON bands (band, bucket)")
+        self._check_settings()
+
+    def _check_settings(self):
+        """
+        Drop the index if it was built with different hashing parameters
+        """
+        settings = json.dumps({"num_perm": NUM_PERM, "bands": BANDS, "shingle": SHINGLE_WORDS, "seed": HASH_SEED})
+        row = self._conn.execute("SELECT value FROM settings WHERE name = 'hashing'").fetchone()
+        if row is not None and row[0] == settings:
+            return
+        if row is not None:
+            logger.warning("Duplicate index was built with other hashing settings; rebuilding it")
+        with self._conn:
+            self._conn.execute("DELETE FROM documents")
+            self._conn.execute("DELETE FROM bands")
+            self._conn.execute("INSERT OR REPLACE INTO settings (name, value) VALUES ('hashing', ?)", (settings,))
+
+    def _buckets(self, signature):
+        return [(band, signature[band * ROWS:(band + 1) * ROWS].tobytes()) for band in range(BANDS)]
+
+    def nearest(self, signature, exclude=None):
+        """
+        Most similar indexed document at or above the threshold, or None
+
+        ``exclude`` skips a document ID (the document itself when reprocessed).
+        """
+        with self._lock:
+            candidates = set()
+            for band, bucket in self._buckets(signature):
+                rows = self._conn.execute("SELECT id FROM bands WHERE band = ? AND bucket = ?", (band, bucket))
+                candidates.update(row[0] for row in rows)
+            candidates.discard(exclude)
+
+            best = None
+            for candidate in candidates:
+                row = self._conn.execute(
+                    "SELECT signature, metadata FROM documents WHERE id = ?", (candidate,)
+                ).fetchone()
+                if row is None:
+                    continue
+                score = similarity(signature, np.frombuffer(row[0], dtype=np.uint32))
+                if score >= self.threshold and (best is None or score > best.similarity):
+                    best = Match(candidate, score, row[1])
+
+            if best:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return best
+
+    def add(self, doc_id, signature, metadata):
+        """
+        Index a document's signature with its metadata JSON, replacing an earlier entry
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM bands WHERE id = ?", (doc_id,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents (id, signature, metadata, created_at) VALUES (?, ?, ?, ?)",
+                (doc_id, signature.tobytes(), metadata, time.time())
+            )
+            self._conn.executemany(
+                "INSERT INTO bands (band, bucket, id) VALUES (?, ?, ?)",
+                [(band, bucket, doc_id) for band, bucket in self._buckets(signature)]
+            )
+
+    def clear(self):
+        """
+        Remove all documents and reset counters
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM documents")
+            self._conn.execute("DELETE FROM bands")
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Return near-duplicate hit/miss counters and the number of indexed documents
+        """
+        with self._lock:
+            documents = self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+            return {"hits": self.hits, "misses": self.misses, "documents": documents, "threshold": self.threshold}
+
+_duplicate_index = None
+_duplicate_index_lock = threading.Lock()
+
+def get_duplicate_index():
+    """
+    Return the shared near-duplicate index, or None if detection is off
+    """
+    global _duplicate_index
+    if DEDUP_MODE == "off":
+        return None
+    with _duplicate_index_lock:
+        if _duplicate_index is None:
+            try:
+                _duplicate_index = DuplicateIndex(DEDUP_INDEX_PATH)
+            except Exception as e:
+                logger.warning(f"Duplicate index unavailable: {str(e)}")
+                return None
+    return _duplicate_index
@@ -1,130 +1,538 @@
-from docx import Document
 import fitz  # PyMuPDF
 import os
-import pytesseract
-from PIL import Image
-import io
+import codecs
 import logging
+import zipfile
+from xml.etree import ElementTree
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from backend.cache import get_extraction_cache, hash_file
+from backend.ocr import get_ocr_engine
+
+try:
+    import charset_normalizer
+except ImportError:
+    charset_normalizer = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Optional: Configure path to tesseract.exe (Windows only)
-# Uncomment and adjust path as needed for your system
-pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+# Resolution used when OCR'ing PDF pages without a text layer (upper bound for adaptive DPI)
+PDF_OCR_DPI = 300
+PDF_OCR_MIN_DPI = 150
+
+# Page-parallel text-layer extraction for large PDFs
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", os.cpu_count() or 1))  # Processes reading page ranges (1 = serial)
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "200"))  # Smaller PDFs are read serially
+PDF_PAGE_CHUNK = int(os.getenv("PDF_PAGE_CHUNK", "100"))  # Pages per worker task
+
+# Per-page OCR classifier thresholds
+MIN_TEXT_CHARS = 50  # Pages with at least this much text-layer text are not OCR'd
+MIN_IMAGE_COVERAGE = 0.05  # Pages whose images cover less of the page have nothing to OCR
+
+# One piece of streamed extraction output (see iter_text_chunks)
+TextChunk = namedtuple("TextChunk", ["page", "source", "text"])
+
+# TXT reading: encoding is sniffed from the first bytes, then the file is decoded in chunks
+TXT_SNIFF_BYTES = 64 * 1024
+TXT_CHUNK_BYTES = 1024 * 1024
+TXT_DETECT_MIN_BYTES = 256  # Shorter files skip statistical detection
+TXT_MAX_BYTES = int(os.getenv("TXT_MAX_BYTES", str(16 * 1024 * 1024)))  # Bytes read per file, 0 = no limit
 
-def extract_text_from_pdf(path):
+# Byte order marks, longest first so UTF-32 LE is not mistaken for UTF-16 LE
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+_WIDE_ENCODINGS = ["utf_16", "utf_16_be", "utf_16_le", "utf_32", "utf_32_be", "utf_32_le"]
+
+# WordprocessingML namespace used in DOCX document XML
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+EMPTY_MESSAGES = {
+    ".pdf": "No text could be extracted from this PDF.",
+    ".docx": "No text could be extracted from this DOCX file.",
+    ".txt": "The text file appears to be empty.",
+}
+
+def classify_page(page):
     """
-    Extract text from PDF using both direct text extraction and OCR
+    Decide from cheap PyMuPDF signals whether OCR can add text to a page
+
+    Returns a dict with ``ocr`` (bool), ``reason``, and for OCR pages the ``dpi``
+    to render at and a ``clip`` rectangle covering the page's images. The DPI
+    follows the embedded images' native resolution, since rendering a 150 DPI
+    scan at 300 DPI only makes Tesseract slower.
     """
-    try:
-        text = ""
-        ocr_text = ""
-        
-        doc = fitz.open(path)
-        logger.info(f"Processing PDF with {len(doc)} pages")
-        
+    page_text = page.get_text()
+    chars = len(page_text.strip())
+    decision = {"ocr": False, "dpi": None, "clip": None, "chars": chars}
+    
+    if chars >= MIN_TEXT_CHARS:
+        decision["reason"] = f"text layer present ({chars} chars)"
+        return decision, page_text
+    
+    page_rect = page.rect
+    page_area = abs(page_rect) or 1
+    images = [info for info in page.get_image_info() if not fitz.Rect(info["bbox"]).is_empty]
+    
+    clip = None
+    image_area = 0.0
+    native_dpi = 0
+    for info in images:
+        bbox = fitz.Rect(info["bbox"]) & page_rect
+        if bbox.is_empty:
+            continue
+        clip = bbox if clip is None else clip | bbox
+        image_area += abs(bbox)
+        if bbox.width > 0 and info.get("width"):
+            native_dpi = max(native_dpi, info["width"] / (bbox.width / 72))
+    coverage = min(1.0, image_area / page_area)
+    
+    if coverage < MIN_IMAGE_COVERAGE:
+        fonts = len(page.get_fonts())
+        if chars == 0 and fonts == 0:
+            decision["reason"] = "blank page (no text, fonts or images)"
+        else:
+            decision["reason"] = f"vector-only page ({chars} chars, {fonts} fonts, {coverage:.0%} image coverage)"
+        return decision, page_text
+    
+    # Text blocks already covering the image area mean the scan has an OCR text layer
+    text_area = sum(
+        abs(fitz.Rect(block[:4]) & clip) for block in page.get_text("blocks") if block[6] == 0
+    )
+    if chars and text_area >= 0.5 * abs(clip):
+        decision["reason"] = f"images already covered by text layer ({coverage:.0%} image coverage)"
+        return decision, page_text
+    
+    dpi = PDF_OCR_DPI
+    if native_dpi:
+        dpi = int(min(PDF_OCR_DPI, max(PDF_OCR_MIN_DPI, round(native_dpi / 50) * 50)))
+    
+    decision.update(
+        ocr=True,
+        dpi=dpi,
+        clip=clip if coverage < 0.9 else None,
+        reason=f"{coverage:.0%} image coverage with {chars} chars of text"
+    )
+    return decision, page_text
+
+def plan_pdf_ocr(path):
+    """
+    Report, page by page, whether extract_text_from_pdf would OCR and why
+    """
+    with fitz.open(path) as doc:
+        plan = []
         for page_num, page in enumerate(doc):
+            decision, _ = classify_page(page)
+            decision["page"] = page_num + 1
+            plan.append(decision)
+        return plan
+
+def join_chunks(chunks, ext=None):
+    """
+    Assemble streamed chunks into the single-string extraction output
+
+    Text-layer and plain-text chunks are concatenated in order, DOCX paragraphs
+    and table rows are joined line by line with tables last, and OCR chunks are
+    appended after the text under an [OCR-Extracted Text] section. ``ext``
+    selects the empty-result message and whether the result is stripped.
+    """
+    body = []
+    paragraphs = []
+    tables = []
+    ocr = []
+    for chunk in chunks:
+        if chunk.source == "failed":
+            continue
+        if chunk.source == "ocr":
+            ocr.append(f"\n[Page {chunk.page} OCR]\n" + chunk.text)
+        elif chunk.source == "paragraph":
+            paragraphs.append(chunk.text)
+        elif chunk.source == "table":
+            tables.append(chunk.text)
+        else:
+            body.append(chunk.text)
+    
+    lines = paragraphs
+    if tables:
+        lines = paragraphs + ["\n[Tables Content]\n"] + tables
+    text = "".join(body) + "\n".join(lines)
+    
+    ocr_text = "".join(ocr)
+    if ocr_text.strip():
+        text += "\n\n[OCR-Extracted Text]\n" + ocr_text
+    
+    if ext == ".pdf":
+        text = text.strip()
+    if not text.strip() and ext in EMPTY_MESSAGES:
+        return EMPTY_MESSAGES[ext]
+    return text
+
+def _classify_page_range(path, start, stop):
+    """
+    Text layer and OCR decision for pages [start, stop) (runs inside a worker process)
+
+    Failed pages come back with a None decision so the range still completes.
+    """
+    results = []
+    with fitz.open(path) as doc:
+        for page_num in range(start, stop):
             try:
-                # Extract visible text
-                page_text = page.get_text()
-                text += page_text
-                
-                # If very little text found, try OCR
-                if len(page_text.strip()) < 50:
-                    try:
-                        # Render page as image
-                        pix = page.get_pixmap(dpi=300)
-                        img = Image.open(io.BytesIO(pix.tobytes("png")))
-                        
-                        # Run OCR on image
-                        ocr_page_text = pytesseract.image_to_string(img, lang='eng')
-                        ocr_text += f"\n[Page {page_num + 1} OCR]\n" + ocr_page_text
-                        
-                    except Exception as ocr_error:
-                        logger.warning(f"OCR failed for page {page_num + 1}: {str(ocr_error)}")
-                        
+                decision, page_text = classify_page(doc[page_num])
             except Exception as page_error:
                 logger.error(f"Error processing page {page_num + 1}: {str(page_error)}")
-                continue
-        
-        doc.close()
+                decision, page_text = None, None
+            results.append((page_num, decision, page_text))
+    return results
+
+def _iter_classified_pages(doc, path, workers, chunk_pages):
+    """
+    Yield (page_num, decision, page_text) in page order
+
+    PDFs with at least PDF_PARALLEL_MIN_PAGES pages are split into ranges of
+    ``chunk_pages`` pages read by ``workers`` processes, each opening its own
+    document. At most two ranges per worker are in flight, so results are
+    merged in order without holding the whole document's text.
+    """
+    page_count = len(doc)
+    if workers <= 1 or page_count < PDF_PARALLEL_MIN_PAGES:
+        for page_num in range(page_count):
+            try:
+                decision, page_text = classify_page(doc[page_num])
+            except Exception as page_error:
+                logger.error(f"Error processing page {page_num + 1}: {str(page_error)}")
+                decision, page_text = None, None
+            yield page_num, decision, page_text
+        return
+    
+    ranges = [(start, min(start + chunk_pages, page_count)) for start in range(0, page_count, chunk_pages)]
+    workers = min(workers, len(ranges))
+    logger.info(f"Reading {page_count} pages in ranges of {chunk_pages} on {workers} processes")
+    ranges = iter(ranges)
+    
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        pending = deque()
+        for start, stop in ranges:
+            pending.append(pool.submit(_classify_page_range, path, start, stop))
+            if len(pending) >= workers * 2:
+                break
+        while pending:
+            results = pending.popleft().result()
+            next_range = next(ranges, None)
+            if next_range:
+                pending.append(pool.submit(_classify_page_range, path, *next_range))
+            yield from results
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def iter_pdf_chunks(path, workers=None, chunk_pages=None):
+    """
+    Yield a PDF's text page by page: each page's text layer, then its OCR text when the page needs it
+
+    Large PDFs read their text layer on ``workers`` processes (default
+    PDF_WORKERS) in ranges of ``chunk_pages`` pages (default PDF_PAGE_CHUNK);
+    OCR of the pages that need it stays in this process.
+    """
+    try:
+        ocr_pages = 0
+        engine = get_ocr_engine()
+        workers = max(1, workers or PDF_WORKERS)
+        chunk_pages = max(1, chunk_pages or PDF_PAGE_CHUNK)
         
-        # Combine text and OCR results
-        final_text = text
-        if ocr_text.strip():
-            final_text += "\n\n[OCR-Extracted Text]\n" + ocr_text
+        with fitz.open(path) as doc:
+            logger.info(f"Processing PDF with {len(doc)} pages")
             
-        return final_text.strip() if final_text.strip() else "No text could be extracted from this PDF."
+            for page_num, decision, page_text in _iter_classified_pages(doc, path, workers, chunk_pages):
+                if decision is None:
+                    continue
+                
+                yield TextChunk(page_num + 1, "text", page_text)
+                
+                if not decision["ocr"]:
+                    logger.debug(f"Page {page_num + 1}: skipping OCR, {decision['reason']}")
+                    continue
+                
+                logger.info(f"Page {page_num + 1}: OCR at {decision['dpi']} DPI, {decision['reason']}")
+                ocr_pages += 1
+                try:
+                    # Render only the image region at the image's native resolution
+                    ocr_page_text = engine.ocr_page(doc[page_num], dpi=decision["dpi"], clip=decision["clip"])
+                except Exception as ocr_error:
+                    logger.warning(f"OCR failed for page {page_num + 1}: {str(ocr_error)}")
+                    # Carries no text, but tells the cache the result is incomplete
+                    yield TextChunk(page_num + 1, "failed", str(ocr_error))
+                    continue
+                yield TextChunk(page_num + 1, "ocr", ocr_page_text)
+            
+            logger.info(f"OCR'd {ocr_pages} of {len(doc)} pages")
         
     except Exception as e:
         logger.error(f"Error extracting text from PDF: {str(e)}")
         raise Exception(f"Failed to extract text from PDF: {str(e)}")
 
-def extract_text_from_docx(path):
+def extract_text_from_pdf(path, workers=None):
     """
-    Extract text from DOCX file
+    Extract text from PDF using both direct text extraction and OCR
+    """
+    return join_chunks(iter_pdf_chunks(path, workers=workers), ".pdf")
+
+def _docx_main_part(archive):
+    """
+    Name of the main document part inside a DOCX zip (normally word/document.xml)
     """
     try:
-        doc = Document(path)
-        paragraphs = []
-        
-        for para in doc.paragraphs:
-            if para.text.strip():  # Only add non-empty paragraphs
-                paragraphs.append(para.text.strip())
-        
-        # Also extract text from tables
-        tables_text = []
-        for table in doc.tables:
-            for row in table.rows:
-                row_text = []
-                for cell in row.cells:
-                    if cell.text.strip():
-                        row_text.append(cell.text.strip())
-                if row_text:
-                    tables_text.append(" | ".join(row_text))
-        
-        # Combine paragraphs and tables
-        all_text = []
-        if paragraphs:
-            all_text.extend(paragraphs)
-        if tables_text:
-            all_text.append("\n[Tables Content]\n")
-            all_text.extend(tables_text)
-        
-        result = "\n".join(all_text)
-        return result if result.strip() else "No text could be extracted from this DOCX file."
+        with archive.open("_rels/.rels") as f:
+            for rel in ElementTree.parse(f).getroot():
+                if rel.get("Type", "").endswith("/officeDocument"):
+                    return rel.get("Target", "").lstrip("/")
+    except KeyError:
+        pass
+    return "word/document.xml"
+
+def _docx_run_text(run):
+    """
+    Text of a w:r element, translating tabs, breaks and non-breaking hyphens like python-docx
+    """
+    text = []
+    for child in run:
+        tag = child.tag
+        if tag == _W + "t":
+            text.append(child.text or "")
+        elif tag in (_W + "tab", _W + "ptab"):
+            text.append("\t")
+        elif tag == _W + "br":
+            if child.get(_W + "type", "textWrapping") == "textWrapping":
+                text.append("\n")
+        elif tag == _W + "cr":
+            text.append("\n")
+        elif tag == _W + "noBreakHyphen":
+            text.append("-")
+    return "".join(text)
+
+def _docx_paragraph_text(paragraph):
+    """
+    Text of a w:p element from its direct runs and hyperlinks
+    """
+    text = []
+    for child in paragraph:
+        if child.tag == _W + "r":
+            text.append(_docx_run_text(child))
+        elif child.tag == _W + "hyperlink":
+            text.extend(_docx_run_text(run) for run in child.iterfind(_W + "r"))
+    return "".join(text)
+
+def _docx_row_cells(row, above):
+    """
+    Cell texts of a w:tr, one per layout-grid column, as python-docx's row.cells yields them
+
+    A horizontally merged cell repeats once per spanned column and a vertically
+    merged continuation cell repeats the text above it. ``above`` maps grid
+    offsets to the previous row's cell texts; returns (texts, offsets map).
+    """
+    cells = []
+    offsets = {}
+    grid_before = row.find(f"{_W}trPr/{_W}gridBefore")
+    offset = int(grid_before.get(_W + "val", 0)) if grid_before is not None else 0
+    for cell in row.iterfind(_W + "tc"):
+        properties = cell.find(_W + "tcPr")
+        span = 1
+        merge = None
+        if properties is not None:
+            grid_span = properties.find(_W + "gridSpan")
+            if grid_span is not None:
+                span = int(grid_span.get(_W + "val", 1))
+            v_merge = properties.find(_W + "vMerge")
+            if v_merge is not None:
+                merge = v_merge.get(_W + "val", "continue")
+        if merge == "continue":
+            text = above.get(offset, "")
+        else:
+            text = "\n".join(_docx_paragraph_text(p) for p in cell.iterfind(_W + "p"))
+        offsets[offset] = text
+        cells.extend([text] * span)
+        offset += span
+    return cells, offsets
+
+def iter_docx_chunks(path):
+    """
+    Yield non-empty DOCX paragraphs and table rows (" | "-joined cells) in document order
+
+    The main document XML is iterparsed straight from the zip and each body
+    paragraph or table row is released once read, so memory stays bounded on
+    large documents. Text matches python-docx's paragraph and cell text.
+    """
+    try:
+        with zipfile.ZipFile(path) as archive, archive.open(_docx_main_part(archive)) as f:
+            stack = []
+            above = {}
+            for event, element in ElementTree.iterparse(f, events=("start", "end")):
+                if event == "start":
+                    stack.append(element)
+                    if element.tag == _W + "tbl" and len(stack) == 3:
+                        above = {}
+                    continue
+                
+                stack.pop()
+                depth = len(stack)
+                tag = element.tag
+                
+                # Body paragraphs: document > body > p
+                if tag == _W + "p" and depth == 2:
+                    text = _docx_paragraph_text(element).strip()
+                    if text:  # Only add non-empty paragraphs
+                        yield TextChunk(None, "paragraph", text)
+                
+                # Rows of body tables: document > body > tbl > tr
+                elif tag == _W + "tr" and depth == 3 and stack[-1].tag == _W + "tbl":
+                    cells, above = _docx_row_cells(element, above)
+                    row_text = [cell.strip() for cell in cells if cell.strip()]
+                    if row_text:
+                        yield TextChunk(None, "table", " | ".join(row_text))
+                
+                # Drop finished body content and table rows to keep memory bounded
+                if depth == 2 or (depth == 3 and stack[-1].tag == _W + "tbl"):
+                    stack[-1].remove(element)
         
     except Exception as e:
         logger.error(f"Error extracting text from DOCX: {str(e)}")
         raise Exception(f"Failed to extract text from DOCX: {str(e)}")
 
-def extract_text_from_txt(path):
+def extract_text_from_docx(path):
     """
-    Extract text from TXT file with multiple encoding attempts
+    Extract text from DOCX file
+    """
+    return join_chunks(iter_docx_chunks(path), ".docx")
+
+def sniff_encoding(prefix):
+    """
+    Guess a text file's encoding from its first bytes
+
+    A byte order mark wins, then UTF-8 if the prefix is valid UTF-8, then the
+    charset_normalizer statistical detector when installed and the prefix is
+    long enough, and finally cp1252 or latin-1 (which accepts any byte).
     """
-    encodings = ['utf-8', 'utf-16', 'latin-1', 'cp1252']
+    for bom, encoding in _BOMS:
+        if prefix.startswith(bom):
+            return encoding
     
-    for encoding in encodings:
-        try:
-            with open(path, "r", encoding=encoding) as f:
-                content = f.read()
-                if content.strip():
-                    return content
-                else:
-                    return "The text file appears to be empty."
-        except UnicodeDecodeError:
-            continue
-        except Exception as e:
-            logger.error(f"Error reading TXT file with {encoding}: {str(e)}")
-            continue
+    try:
+        # Incremental so a multi-byte character cut off at the end of the prefix is not an error
+        codecs.getincrementaldecoder("utf-8")().decode(prefix, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    
+    # Statistics on a handful of bytes are noise; BOM-less UTF-16/32 is too rare to guess
+    if charset_normalizer is not None and len(prefix) >= TXT_DETECT_MIN_BYTES:
+        best = charset_normalizer.from_bytes(prefix, cp_exclusion=_WIDE_ENCODINGS).best()
+        if best is not None:
+            return best.encoding
     
-    raise Exception("Failed to read text file with any supported encoding")
+    try:
+        prefix.decode("cp1252")
+        return "cp1252"
+    except UnicodeDecodeError:
+        return "latin-1"
 
-def extract_text(path):
+def iter_txt_chunks(path, max_bytes=None):
     """
-    Main function to extract text from various file formats
+    Stream a TXT file as decoded chunks, sniffing the encoding once from its first bytes
+
+    The file is read TXT_CHUNK_BYTES at a time through an incremental decoder
+    (undecodable bytes become U+FFFD) with universal newlines, and reading
+    stops after ``max_bytes`` (default TXT_MAX_BYTES, 0 = no limit).
+    """
+    max_bytes = TXT_MAX_BYTES if max_bytes is None else max_bytes
+    try:
+        with open(path, "rb") as f:
+            data = f.read(TXT_SNIFF_BYTES)
+            encoding = sniff_encoding(data)
+            logger.info(f"Reading text file as {encoding}")
+            
+            decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+            total = 0
+            pending_cr = ""
+            truncated = False
+            while data:
+                if max_bytes and total + len(data) > max_bytes:
+                    data = data[:max_bytes - total]
+                    truncated = True
+                total += len(data)
+                
+                # Translate \r\n and \r to \n, holding back a trailing \r until the next chunk
+                text = pending_cr + decoder.decode(data)
+                pending_cr = "\r" if text.endswith("\r") else ""
+                text = text[:len(text) - len(pending_cr)].replace("\r\n", "\n").replace("\r", "\n")
+                if text:
+                    yield TextChunk(None, "text", text)
+                
+                if truncated:
+                    logger.warning(f"Text file truncated at {max_bytes} bytes (TXT_MAX_BYTES)")
+                    break
+                data = f.read(TXT_CHUNK_BYTES)
+            
+            if not truncated:
+                text = (pending_cr + decoder.decode(b"", final=True)).replace("\r\n", "\n").replace("\r", "\n")
+                if text:
+                    yield TextChunk(None, "text", text)
+        
+    except Exception as e:
+        logger.error(f"Error reading TXT file: {str(e)}")
+        raise Exception(f"Failed to read text file: {str(e)}")
+
+def extract_text_from_txt(path):
+    """
+    Extract text from TXT file, detecting its encoding
+    """
+    return join_chunks(iter_txt_chunks(path), ".txt")
+
+def _iter_uncached(path, ext, workers=None):
+    """
+    Dispatch to the chunk generator for the given file extension
+    """
+    if ext == ".pdf":
+        return iter_pdf_chunks(path, workers=workers)
+    elif ext == ".docx":
+        return iter_docx_chunks(path)
+    elif ext == ".txt":
+        return iter_txt_chunks(path)
+    else:
+        raise ValueError(f"Unsupported file type: {ext}. Supported formats: PDF, DOCX, TXT")
+
+def _stream_chunks(chunks, cache, key, ext):
+    """
+    Pass chunks through, caching the joined text once the document has been fully read
+
+    Results with a failed page or only the empty-document message are not
+    cached, so a fixed OCR setup gets to extract the file again.
+    """
+    seen = []
+    for chunk in chunks:
+        seen.append(chunk)
+        yield chunk
+    text = join_chunks(seen, ext)
+    if any(chunk.source == "failed" for chunk in seen):
+        logger.warning("Not caching extraction result: OCR failed on some pages")
+    elif text != EMPTY_MESSAGES.get(ext):
+        cache.set(key, text)
+
+def iter_text_chunks(path, use_cache=True, workers=None):
+    """
+    Stream a document's text as TextChunk(page, source, text) tuples while it is parsed
+
+    ``page`` is the 1-based PDF page (None for DOCX/TXT) and ``source`` is
+    "text" (PDF text layer or plain text), "ocr", "paragraph", "table" or
+    "failed" (a page whose OCR raised; its text is the error message).
+    Consumers can start on the first pages before a large PDF is finished.
+    ``workers`` caps the processes reading large PDFs (see iter_pdf_chunks).
+    A cache hit yields the previously extracted text as a single "cache" chunk;
+    otherwise the joined text is cached once the generator is exhausted.
     """
     if not os.path.exists(path):
         raise FileNotFoundError(f"File not found: {path}")
@@ -136,14 +544,37 @@ def extract_text(path):
     
     logger.info(f"Extracting text from {ext} file: {os.path.basename(path)}")
     
-    if ext == ".pdf":
-        return extract_text_from_pdf(path)
-    elif ext == ".docx":
-        return extract_text_from_docx(path)
-    elif ext == ".txt":
-        return extract_text_from_txt(path)
-    else:
-        raise ValueError(f"Unsupported file type: {ext}. Supported formats: PDF, DOCX, TXT")
+    chunks = _iter_uncached(path, ext, workers)
+    
+    cache = get_extraction_cache() if use_cache else None
+    if cache:
+        settings = {
+            "operation": "extract_text",
+            "ext": ext,
+            "dpi": [PDF_OCR_MIN_DPI, PDF_OCR_DPI],
+            "ocr": get_ocr_engine().settings(),
+            "thresholds": [MIN_TEXT_CHARS, MIN_IMAGE_COVERAGE],
+            "txt_max_bytes": TXT_MAX_BYTES,
+        }
+        key = cache.make_key(hash_file(path), settings)
+        cached = cache.get(key)
+        if cached is not None:
+            logger.info("Using cached extraction result")
+            chunks.close()
+            return iter([TextChunk(None, "cache", cached)])
+        return _stream_chunks(chunks, cache, key, ext)
+    
+    return chunks
+
+def extract_text(path, use_cache=True, workers=None):
+    """
+    Main function to extract text from various file formats
+
+    Results are cached on disk by file content hash, so re-uploads of the same
+    document skip parsing and OCR entirely.
+    """
+    ext = os.path.splitext(path)[-1].lower()
+    return join_chunks(iter_text_chunks(path, use_cache, workers), ext)
 
 # Test function
 def test_extraction(file_path):
@@ -0,0 +1,108 @@
+import cv2
+import numpy as np
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Region detection settings
+MIN_REGION_AREA = 150  # Pixels; smaller blobs are specks or noise
+MIN_REGION_HEIGHT = 8  # Pixels
+MAX_INK_RATIO = 0.6  # Share of dark pixels above which a blob is a photo/graphic, not text
+REGION_PADDING = 4  # Pixels of margin kept around each region
+SINGLE_LINE_RATIO = 1.8  # Regions up to this multiple of the median height are read as one line
+
+def _to_gray(image):
+    return image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+def _overlaps(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    return ax < bx + bw and bx < ax + aw and ay < by + bh and by < ay + ah
+
+def _union(a, b):
+    x0, y0 = min(a[0], b[0]), min(a[1], b[1])
+    x1, y1 = max(a[0] + a[2], b[0] + b[2]), max(a[1] + a[3], b[1] + b[3])
+    return (x0, y0, x1 - x0, y1 - y0)
+
+def merge_overlapping(boxes):
+    """
+    Replace boxes that overlap (directly or through a chain) with their union
+
+    Padding and the bounding rects of irregular contours can overlap; OCR'ing
+    both crops would read the shared text twice.
+    """
+    boxes = list(boxes)
+    changed = True
+    while changed:
+        changed = False
+        merged = []
+        for box in boxes:
+            for i, other in enumerate(merged):
+                if _overlaps(box, other):
+                    merged[i] = _union(box, other)
+                    changed = True
+                    break
+            else:
+                merged.append(box)
+        boxes = merged
+    return boxes
+
+def detect_text_regions(image):
+    """
+    Find text regions on a page with OpenCV contours
+
+    Dark strokes are binarized, dilated horizontally so characters merge into
+    words and lines, and the resulting contours become candidate regions.
+    Specks and ink-heavy blobs (photos, filled graphics) are dropped, and
+    overlapping padded boxes are merged so no text is read twice.
+    Returns dicts with ``box`` (x, y, w, h) and a suggested ``psm``
+    (7 for single lines, 6 for multi-line blocks) in reading order.
+    """
+    gray = _to_gray(image)
+    height, width = gray.shape
+
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)
+
+    # Merge neighbouring characters; kernel scales with page resolution
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (max(3, width // 100), max(1, height // 500)))
+    merged = cv2.dilate(binary, kernel, iterations=2)
+
+    contours, _ = cv2.findContours(merged, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    boxes = []
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        if w * h < MIN_REGION_AREA or h < MIN_REGION_HEIGHT:
+            continue
+        ink = cv2.countNonZero(binary[y:y + h, x:x + w]) / float(w * h)
+        if ink > MAX_INK_RATIO:
+            continue
+        x0 = max(0, x - REGION_PADDING)
+        y0 = max(0, y - REGION_PADDING)
+        x1 = min(width, x + w + REGION_PADDING)
+        y1 = min(height, y + h + REGION_PADDING)
+        boxes.append((x0, y0, x1 - x0, y1 - y0))
+
+    if not boxes:
+        return []
+    boxes = merge_overlapping(boxes)
+
+    median_height = float(np.median([h for _, _, _, h in boxes]))
+    line_tolerance = max(1, int(median_height / 2))
+
+    # Top-to-bottom, then left-to-right for regions on the same line
+    boxes.sort(key=lambda box: (box[1] // line_tolerance, box[0]))
+
+    return [
+        {"box": box, "psm": 7 if box[3] <= SINGLE_LINE_RATIO * median_height else 6}
+        for box in boxes
+    ]
+
+def text_coverage(regions, shape):
+    """
+    Fraction of the page area covered by the detected regions
+    """
+    area = float(shape[0] * shape[1]) or 1.0
+    return min(1.0, sum(w * h for _, _, w, h in (region["box"] for region in regions)) / area)
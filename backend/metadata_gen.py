@@ -1,21 +1,93 @@
 import os
+import asyncio
+import functools
 import requests
-from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 import json
 import logging
+import re
+import threading
+from collections import Counter
 import time
+from backend.analytics import ANALYTICS_FIELDS, analyze_text
+from backend.cache import get_metadata_cache
+from backend.metadata_schema import (
+    FIELDS,
+    DocumentMetadata,
+    describe_fields,
+    metadata_json_schema,
+    parse_partial_json,
+    validate_metadata,
+)
+from backend.prompt import PromptStats, budget_cut, compact_prompt, compact_text, count_tokens, fit_to_budget, full_prompt
+from backend.rate_limit import RateLimiter, backoff_delay, parse_retry_after
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Load environment variables
-load_dotenv()
-
 # Configuration
 API_KEY = os.getenv("OPENROUTER_API_KEY")
 MODEL = "meta-llama/llama-3-8b-instruct"  # You can change this to other models
-API_URL = "https://openrouter.ai/api/v1/chat/completions"
+API_URL = os.getenv("OPENROUTER_API_URL", "https://openrouter.ai/api/v1/chat/completions")
+
+# HTTP client settings
+REQUEST_TIMEOUT = float(os.getenv("OPENROUTER_TIMEOUT", "60"))  # seconds per request
+HTTP_POOL_SIZE = 16  # Keep-alive connections shared by all requests
+METADATA_CONCURRENCY = int(os.getenv("METADATA_CONCURRENCY", "4"))  # In-flight requests for batch generation
+
+# Client-side quota and retry policy (0 disables a quota)
+RATE_LIMIT_RPM = int(os.getenv("OPENROUTER_RPM", "60"))  # Requests per minute
+RATE_LIMIT_TPM = int(os.getenv("OPENROUTER_TPM", "0"))  # Tokens per minute
+MAX_RETRIES = int(os.getenv("OPENROUTER_MAX_RETRIES", "5"))
+BACKOFF_BASE = 1.0  # seconds
+BACKOFF_MAX = 60.0  # seconds
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Shared by every request in this process; rate_limiter.stats() exposes throttling metrics
+rate_limiter = RateLimiter(RATE_LIMIT_RPM, RATE_LIMIT_TPM)
+
+# Sampling parameters (part of the metadata cache key)
+TEMPERATURE = 0.3  # Lower temperature for more consistent outputs
+MAX_TOKENS = 1500
+TOP_P = 0.9
+
+# Document tokens sent in a single request; longer documents are truncated
+TOKEN_BUDGET = int(os.getenv("METADATA_TOKEN_BUDGET", "2000"))  # Adjust based on your model's context window
+
+# "full" sends the annotated JSON template; "compact" a one-line schema and cleaned-up text
+PROMPT_MODE = os.getenv("METADATA_PROMPT_MODE", "full")
+
+# Fixed cut of the original prompt, which token savings are reported against
+MAX_CHARS = 8000
+
+# Split documents over TOKEN_BUDGET into budget-sized chunks and merge per-chunk metadata instead of truncating
+CHUNKED_METADATA = os.getenv("METADATA_CHUNKED", "0") == "1"
+MAX_MERGED_SUMMARY_CHARS = 1500
+
+# Structured output: "json_schema" (strict schema), "json_object" (JSON mode) or "none"
+RESPONSE_FORMAT = os.getenv("METADATA_RESPONSE_FORMAT", "json_object")
+_response_format_rejected = False  # Set once the model answers 400 to response_format
+
+# Follow-up requests that ask only for fields missing or invalid in the first answer
+REPAIR_ATTEMPTS = int(os.getenv("METADATA_REPAIR_ATTEMPTS", "1"))
+REPAIR_MAX_TOKENS = 600
+
+# Fields computed locally by backend.analytics instead of asking the model (comma-separated)
+LOCAL_FIELDS = tuple(
+    name.strip() for name in os.getenv("METADATA_LOCAL_FIELDS", ",".join(ANALYTICS_FIELDS)).split(",")
+    if name.strip() in ANALYTICS_FIELDS
+)
+
+# Skip the model entirely and return only the locally computed fields
+OFFLINE = os.getenv("METADATA_OFFLINE", "0") == "1"
+
+# Bump whenever the prompt template changes so cached responses are not reused
+PROMPT_VERSION = "4"
+
+# Prompt tokens sent vs. the full prompt; prompt_stats.stats() reports tokens saved
+prompt_stats = PromptStats()
 
 def validate_api_setup():
     """
@@ -25,59 +97,92 @@ def validate_api_setup():
         raise ValueError("OPENROUTER_API_KEY not found in environment variables. Please set it in your .env file.")
     return True
 
-def generate_rich_metadata(text):
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
     """
-    Generate comprehensive metadata from document text using OpenRouter API
+    Return the shared HTTP session so requests reuse pooled keep-alive connections
     """
-    validate_api_setup()
-    
-    # Truncate text if too long to avoid token limits
-    max_chars = 8000  # Adjust based on your model's context window
-    if len(text) > max_chars:
-        text = text[:max_chars] + "... [truncated]"
-        logger.warning(f"Text truncated to {max_chars} characters due to length")
-    
-    prompt = f"""
-You are an expert document analysis assistant. Analyze the following document content and extract comprehensive metadata.
-
-Please provide a detailed analysis in valid JSON format with the following fields:
-
-{{
-    "title": "Document title (infer if not explicitly stated)",
-    "keywords": ["keyword1", "keyword2", "keyword3", "keyword4", "keyword5"],
-    "summary": "2-3 sentence summary of the document",
-    "document_category": "Category (e.g., Legal, Academic, Finance, Health, Technical, Business, Personal, etc.)",
-    "language": "Primary language of the document",
-    "sentiment": "Overall sentiment (Positive, Negative, Neutral)",
-    "named_entities": {{
-        "people": ["person1", "person2"],
-        "organizations": ["org1", "org2"],
-        "locations": ["location1", "location2"]
-    }},
-    "confidential": "Assessment if document contains sensitive information (Yes/No/Uncertain)",
-    "important_dates": ["date1", "date2"],
-    "document_structure": ["section1", "section2", "section3"],
-    "author": "Author name if mentioned or 'Not specified'",
-    "intended_audience": "Target audience (e.g., General Public, Professionals, Students, etc.)",
-    "estimated_reading_time": "Reading time in minutes (integer)",
-    "content_features": {{
-        "has_tables": "Yes/No",
-        "has_charts": "Yes/No", 
-        "has_images": "Yes/No",
-        "has_references": "Yes/No"
-    }},
-    "topic_tags": ["tag1", "tag2", "tag3"],
-    "key_points": ["point1", "point2", "point3"],
-    "document_quality": "Assessment of document quality (High/Medium/Low)",
-    "technical_level": "Technical complexity (Beginner/Intermediate/Advanced)",
-    "word_count": "Estimated word count (integer)"
-}}
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+    return _session
 
-Document Content:
-{text}
+def estimate_request_tokens(payload):
+    """
+    Token cost of a request (prompt plus completion budget) for the tokens/min quota
+    """
+    prompt_tokens = sum(count_tokens(message["content"]) for message in payload["messages"])
+    return prompt_tokens + payload.get("max_tokens", 0)
+
+def _post_with_retries(headers, payload, timeout, estimated_tokens):
+    """
+    POST to the API through the shared rate limiter
+
+    Retries 429/5xx responses and transient network errors with exponential
+    backoff and jitter, honouring Retry-After. A 429 pauses every caller on the
+    limiter, not just this one. Returns the last response once retries run out.
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        rate_limiter.acquire(estimated_tokens)
+        
+        try:
+            response = get_session().post(API_URL, headers=headers, json=payload, timeout=timeout)
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+            if attempt == MAX_RETRIES:
+                rate_limiter.record_drop()
+                raise
+            delay = backoff_delay(attempt, BACKOFF_BASE, BACKOFF_MAX)
+            logger.warning(f"Request failed ({type(e).__name__}). Retrying in {delay:.1f}s "
+                           f"(attempt {attempt + 1}/{MAX_RETRIES})...")
+            rate_limiter.record_retry()
+            time.sleep(delay)
+            continue
+        
+        if response.status_code not in RETRYABLE_STATUS_CODES:
+            return response
+        if attempt == MAX_RETRIES:
+            rate_limiter.record_drop()
+            return response
+        
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        delay = backoff_delay(attempt, BACKOFF_BASE, BACKOFF_MAX, retry_after)
+        logger.warning(f"API returned {response.status_code}. Retrying in {delay:.1f}s "
+                       f"(attempt {attempt + 1}/{MAX_RETRIES})...")
+        rate_limiter.record_retry()
+        if response.status_code == 429:
+            # Cool down every worker sharing the limiter; the next acquire() waits it out
+            rate_limiter.pause(delay)
+        else:
+            time.sleep(delay)
+
+def _response_format(names=None):
+    """
+    response_format for a request asking for ``names`` (default: every field), or None when disabled
+    """
+    if _response_format_rejected or RESPONSE_FORMAT == "none":
+        return None
+    if RESPONSE_FORMAT == "json_schema":
+        return {
+            "type": "json_schema",
+            "json_schema": {"name": "document_metadata", "strict": True, "schema": metadata_json_schema(names)}
+        }
+    return {"type": "json_object"}
+
+def _chat(prompt, max_tokens, timeout, response_format=None):
+    """
+    Send one chat completion request and return the message content
 
-Important: Return ONLY the JSON object, properly formatted and valid. Do not include any additional text, explanations, or markdown formatting.
+    A 400 caused by response_format (model without JSON mode) is retried once
+    without it, and structured output stays off for the rest of the process.
     """
+    global _response_format_rejected
     
     headers = {
         "Authorization": f"Bearer {API_KEY}",
@@ -98,15 +203,24 @@ Important: Return ONLY the JSON object, properly formatted and valid. Do not inc
                 "content": prompt
             }
         ],
-        "temperature": 0.3,  # Lower temperature for more consistent outputs
-        "max_tokens": 1500,
-        "top_p": 0.9
+        "temperature": TEMPERATURE,
+        "max_tokens": max_tokens,
+        "top_p": TOP_P
     }
+    if response_format:
+        payload["response_format"] = response_format
     
     try:
         logger.info(f"Sending request to OpenRouter API using model: {MODEL}")
         
-        response = requests.post(API_URL, headers=headers, json=payload, timeout=60)
+        estimated_tokens = estimate_request_tokens(payload)
+        response = _post_with_retries(headers, payload, timeout, estimated_tokens)
+        
+        if response.status_code == 400 and response_format and "response_format" in response.text:
+            logger.warning(f"Model {MODEL} rejected response_format; retrying without structured output")
+            _response_format_rejected = True
+            payload.pop("response_format")
+            response = _post_with_retries(headers, payload, timeout, estimated_tokens)
         
         if response.status_code == 200:
             result = response.json()
@@ -118,19 +232,12 @@ Important: Return ONLY the JSON object, properly formatted and valid. Do not inc
                 logger.info(f"Token usage - Prompt: {usage.get('prompt_tokens', 'N/A')}, "
                           f"Completion: {usage.get('completion_tokens', 'N/A')}, "
                           f"Total: {usage.get('total_tokens', 'N/A')}")
+                rate_limiter.record_usage(estimated_tokens, usage.get("total_tokens"))
             
             return content
             
         elif response.status_code == 429:
-            logger.warning("Rate limit exceeded. Waiting 5 seconds before retry...")
-            time.sleep(5)
-            # Retry once
-            response = requests.post(API_URL, headers=headers, json=payload, timeout=60)
-            if response.status_code == 200:
-                result = response.json()
-                return result["choices"][0]["message"]["content"]
-            else:
-                raise Exception(f"API rate limit error: {response.status_code} - {response.text}")
+            raise Exception(f"API rate limit error: {response.status_code} - {response.text}")
                 
         else:
             error_msg = f"OpenRouter API error: {response.status_code}"
@@ -152,21 +259,437 @@ Important: Return ONLY the JSON object, properly formatted and valid. Do not inc
         logger.error(f"Error calling OpenRouter API: {str(e)}")
         raise Exception(f"API call failed: {str(e)}")
 
-def generate_metadata(text):
+def complete_metadata(content, text, timeout=None, names=None):
+    """
+    Turn a model response into validated DocumentMetadata
+
+    The response is parsed (and repaired if malformed or cut off) and checked
+    against the schema for ``names`` (default: every field). Fields that are
+    missing or invalid are requested again on their own, up to
+    REPAIR_ATTEMPTS follow-up calls, instead of re-running the whole
+    analysis; any still missing fall back to schema defaults.
+    """
+    return _complete_metadata(content, text, timeout, names)[0]
+
+def _complete_metadata(content, text, timeout=None, names=None):
+    """
+    complete_metadata returning (metadata, problems) for the fields left at their defaults
+    """
+    try:
+        data = parse_partial_json(content)
+    except ValueError as e:
+        logger.warning(f"Could not parse metadata response: {str(e)}")
+        data = {}
+    values, problems = validate_metadata(data, names)
+    
+    for attempt in range(REPAIR_ATTEMPTS):
+        if not problems:
+            break
+        names = list(problems)
+        logger.info(f"Re-asking for {len(names)} missing or invalid field(s): {', '.join(names)}")
+        prompt = f"""
+Analyze the following document content and provide ONLY these metadata fields as a JSON object:
+
+{describe_fields(names)}
+
+Document Content:
+{text}
+
+Important: Return ONLY the JSON object with exactly these fields, properly formatted and valid. Do not include any additional text, explanations, or markdown formatting.
+        """
+        try:
+            answer = parse_partial_json(_chat(prompt, REPAIR_MAX_TOKENS, timeout, _response_format(names)))
+        except Exception as e:
+            logger.warning(f"Field repair request failed: {str(e)}")
+            break
+        repaired, problems = validate_metadata(answer, names)
+        values.update(repaired)
+    
+    if not values:
+        raise Exception("Model response contained no usable metadata")
+    if problems:
+        logger.warning(f"Using defaults for missing or invalid field(s): {', '.join(problems)}")
+    return DocumentMetadata.from_dict(values), problems
+
+def with_local_fields(values, local):
+    """
+    Overlay locally computed fields on model metadata values
+
+    Local fields replace the model's; the extractor content flags only turn
+    a feature on, since the model may see charts or images the extractors did not mark.
+    """
+    merged = dict(values)
+    for name, value in local.items():
+        if name != "content_features":
+            merged[name] = value
+            continue
+        features = dict(merged.get("content_features") or {})
+        for flag, present in value.items():
+            if present == "Yes" or flag not in features:
+                features[flag] = present
+        merged["content_features"] = features
+    return merged
+
+def generate_offline_metadata(text):
+    """
+    Partial metadata from local analytics only, without any network call
+
+    Fields that need the model, and content flags the extractors cannot
+    report, are None instead of defaults that would read as an analysis.
+    """
+    logger.info("Offline mode: computing local metadata fields only")
+    return DocumentMetadata.partial(analyze_text(text))
+
+def local_fields(text):
+    """
+    LOCAL_FIELDS computed by backend.analytics, minus a language it could not identify
+
+    An undetermined language is left to the model instead of being reported as "Not specified".
+    """
+    local = analyze_text(text, LOCAL_FIELDS)
+    if local.get("language") == "Not specified":
+        del local["language"]
+    return local
+
+def reuse_metadata(metadata_json, text):
+    """
+    Metadata stored for a near-duplicate document, with LOCAL_FIELDS recomputed for this text
+    """
+    return DocumentMetadata.from_dict(with_local_fields(json.loads(metadata_json), local_fields(text)))
+
+def generate_rich_metadata(text, use_cache=True, timeout=None):
+    """
+    Generate comprehensive metadata from document text using OpenRouter API
+
+    Returns a validated DocumentMetadata. LOCAL_FIELDS are computed from the
+    whole text by backend.analytics and the model is asked only for the rest
+    (including the language, when it cannot be identified locally).
+    The document text is cut to TOKEN_BUDGET tokens; in compact prompt mode it
+    is first stripped of page markers, OCR noise and repeated headers/footers
+    and sent with a minimal schema. Model answers are cached by normalized
+    text, model, prompt version and mode, requested fields, output format and
+    sampling parameters; pass use_cache=False to always call the API.
+    """
+    validate_api_setup()
+    timeout = timeout or REQUEST_TIMEOUT
+    
+    # Local fields are cheap, so they are recomputed on every call rather than cached
+    local = local_fields(text)
+    names = tuple(name for name in FIELDS if name not in LOCAL_FIELDS or name not in local)
+    
+    baseline_text = text[:MAX_CHARS] + "... [truncated]" if len(text) > MAX_CHARS else text
+    if PROMPT_MODE == "compact":
+        text = compact_text(text)
+    
+    # Truncate text if too long to avoid token limits
+    text, truncated = fit_to_budget(text, TOKEN_BUDGET)
+    if truncated:
+        logger.warning(f"Text truncated to {TOKEN_BUDGET} tokens due to length")
+    
+    cache = get_metadata_cache() if use_cache else None
+    if cache:
+        cache_key = cache.make_key(
+            text,
+            model=MODEL,
+            prompt_version=PROMPT_VERSION,
+            prompt_mode=PROMPT_MODE,
+            token_budget=TOKEN_BUDGET,
+            fields=",".join(names),
+            response_format=RESPONSE_FORMAT,
+            temperature=TEMPERATURE,
+            max_tokens=MAX_TOKENS,
+            top_p=TOP_P
+        )
+        cached = cache.get(cache_key)
+        if cached is not None:
+            try:
+                metadata = DocumentMetadata.from_dict(with_local_fields(json.loads(cached), local))
+                logger.info("Using cached metadata response")
+                return metadata
+            except ValueError:
+                logger.warning("Ignoring unreadable cached metadata response")
+    
+    if PROMPT_MODE == "compact":
+        prompt = compact_prompt(text, names)
+    else:
+        prompt = full_prompt(text, names)
+    
+    # Savings are measured against the full prompt for every field on the fixed MAX_CHARS cut
+    prompt_tokens = count_tokens(prompt)
+    baseline_tokens = count_tokens(full_prompt(baseline_text))
+    prompt_stats.record(prompt_tokens, baseline_tokens)
+    logger.info(f"Prompt: {prompt_tokens} tokens ({baseline_tokens - prompt_tokens} saved vs. full prompt)")
+    
+    content = _chat(prompt, MAX_TOKENS, timeout, _response_format(names))
+    metadata, problems = _complete_metadata(content, text, timeout, names)
+    
+    # Defaults standing in for unanswered fields must not be served as answers for the whole TTL
+    if cache and not problems:
+        cache.set(cache_key, metadata.to_json())
+    elif cache:
+        logger.info("Not caching metadata: some fields fell back to defaults")
+    return DocumentMetadata.from_dict(with_local_fields(metadata.to_dict(), local))
+
+def generate_metadata(text, use_cache=True, timeout=None, chunked=None, concurrency=None, offline=None):
     """
     Main function to generate metadata
+
+    Returns a validated DocumentMetadata. With chunked=True (default:
+    METADATA_CHUNKED) documents over TOKEN_BUDGET tokens are split on page/section
+    boundaries, analysed chunk by chunk with at most ``concurrency`` requests in
+    flight, and merged into a single result. With offline=True (default:
+    METADATA_OFFLINE) only the locally computed fields are filled in.
     """
     if not text or len(text.strip()) < 10:
         raise ValueError("Text is too short for meaningful metadata generation")
     
     logger.info(f"Generating metadata for text of length: {len(text)} characters")
     
+    if chunked is None:
+        chunked = CHUNKED_METADATA
+    if offline is None:
+        offline = OFFLINE
+    
     try:
-        return generate_rich_metadata(text)
+        if offline:
+            return generate_offline_metadata(text)
+        if chunked and count_tokens(text) > TOKEN_BUDGET:
+            return generate_chunked_metadata(text, use_cache=use_cache, timeout=timeout, concurrency=concurrency)
+        return generate_rich_metadata(text, use_cache=use_cache, timeout=timeout)
     except Exception as e:
         logger.error(f"Metadata generation failed: {str(e)}")
         raise
 
+# Page markers emitted by the extractors, plus blank lines between sections
+_CHUNK_BOUNDARY = re.compile(r"(?=\n--- Page \d+ ---\n)|(?=\n\[Page \d+ OCR\]\n)|\n\s*\n")
+
+def split_text_chunks(text, max_tokens=None):
+    """
+    Split text into chunks of at most max_tokens (default: TOKEN_BUDGET), preferring page and section boundaries
+
+    Chunks are sized in the same tokens that generate_rich_metadata budgets,
+    so no chunk is truncated again before it is sent.
+    """
+    max_tokens = max_tokens or TOKEN_BUDGET
+    chunks = []
+    current = []
+    current_tokens = 0
+    
+    for block in _CHUNK_BOUNDARY.split(text):
+        if not block or not block.strip():
+            continue
+        
+        # Blocks longer than a chunk are cut at the last whitespace within the budget
+        block_tokens = count_tokens(block)
+        while block_tokens > max_tokens:
+            cut = max(1, budget_cut(block, max_tokens))
+            if current:
+                chunks.append("\n\n".join(current))
+                current, current_tokens = [], 0
+            chunks.append(block[:cut])
+            block = block[cut:].lstrip()
+            block_tokens = count_tokens(block)
+        if not block:
+            continue
+        
+        # One token for the blank line joining blocks
+        if current and current_tokens + block_tokens + 1 > max_tokens:
+            chunks.append("\n\n".join(current))
+            current, current_tokens = [], 0
+        current.append(block)
+        current_tokens += block_tokens + 1
+    
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+def _as_int(value):
+    """
+    Parse an integer out of model output such as 12, "12" or "about 12 minutes"
+    """
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = re.search(r"\d+", str(value or ""))
+    return int(match.group()) if match else 0
+
+def _union(lists, limit=None):
+    """
+    Merge lists of strings, ranking by how many chunks mention an item, then first appearance
+    """
+    counts = Counter()
+    first_seen = {}
+    display = {}
+    for items in lists:
+        if not isinstance(items, list):
+            continue
+        for item in items:
+            if not isinstance(item, str) or not item.strip():
+                continue
+            key = item.strip().lower()
+            counts[key] += 1
+            if key not in first_seen:
+                first_seen[key] = len(first_seen)
+                display[key] = item.strip()
+    ordered = sorted(counts, key=lambda key: (-counts[key], first_seen[key]))
+    return [display[key] for key in ordered[:limit]]
+
+def _majority(values, default="Not specified"):
+    """
+    Most common value across chunks, ties broken by first appearance
+    """
+    values = [v for v in values if isinstance(v, str) and v.strip()]
+    if not values:
+        return default
+    counts = Counter(values)
+    return max(values, key=lambda v: (counts[v], -values.index(v)))
+
+def _any_yes(values):
+    """
+    "Yes" if any chunk answered Yes, otherwise "No"
+    """
+    return "Yes" if any(str(v).strip().lower() == "yes" for v in values) else "No"
+
+def merge_metadata(parts):
+    """
+    Deterministically merge per-chunk metadata dicts into the single-document schema
+    """
+    if not parts:
+        raise ValueError("No chunk metadata to merge")
+    
+    def field(name):
+        return [part.get(name) for part in parts]
+    
+    summaries = [str(s).strip() for s in field("summary") if s and str(s).strip()]
+    summary = summaries[0] if summaries else ""
+    for extra in summaries[1:]:
+        # Keep the opening chunk's summary and the lead sentence of each later chunk
+        lead = re.split(r"(?<=[.!?])\s", extra, maxsplit=1)[0]
+        if len(summary) + len(lead) + 1 > MAX_MERGED_SUMMARY_CHARS:
+            break
+        summary += " " + lead
+    
+    entities = [part.get("named_entities") or {} for part in parts]
+    features = [part.get("content_features") or {} for part in parts]
+    confidential = field("confidential")
+    authors = [a for a in field("author") if a and str(a).strip().lower() != "not specified"]
+    
+    return {
+        "title": next((t for t in field("title") if t), "Untitled"),
+        "keywords": _union(field("keywords"), limit=10),
+        "summary": summary,
+        "document_category": _majority(field("document_category")),
+        "language": _majority(field("language")),
+        "sentiment": _majority(field("sentiment")),
+        "named_entities": {
+            kind: _union([e.get(kind) for e in entities if isinstance(e, dict)])
+            for kind in ("people", "organizations", "locations")
+        },
+        "confidential": "Yes" if _any_yes(confidential) == "Yes" else _majority(confidential, "Uncertain"),
+        "important_dates": _union(field("important_dates")),
+        "document_structure": _union(field("document_structure")),
+        "author": authors[0] if authors else "Not specified",
+        "intended_audience": _majority(field("intended_audience")),
+        "estimated_reading_time": sum(_as_int(v) for v in field("estimated_reading_time")),
+        "content_features": {
+            name: _any_yes([f.get(name) for f in features if isinstance(f, dict)])
+            for name in ("has_tables", "has_charts", "has_images", "has_references")
+        },
+        "topic_tags": _union(field("topic_tags"), limit=10),
+        "key_points": _union(field("key_points"), limit=10),
+        "document_quality": _majority(field("document_quality")),
+        "technical_level": _majority(field("technical_level")),
+        "word_count": sum(_as_int(v) for v in field("word_count")),
+    }
+
+def generate_chunked_metadata(text, use_cache=True, timeout=None, concurrency=None):
+    """
+    Map-reduce metadata generation for documents over TOKEN_BUDGET tokens
+
+    Each chunk is analysed independently (bounded by ``concurrency``) and the
+    results are merged with merge_metadata. Chunks whose request fails are
+    skipped; the call only fails if every chunk does.
+    """
+    chunks = split_text_chunks(text, TOKEN_BUDGET)
+    logger.info(f"Generating chunked metadata for {len(chunks)} chunks")
+    
+    responses = generate_metadata_many(
+        chunks,
+        concurrency=concurrency,
+        timeout=timeout,
+        use_cache=use_cache,
+        return_exceptions=True
+    )
+    
+    parts = []
+    for index, response in enumerate(responses):
+        if isinstance(response, Exception):
+            logger.warning(f"Chunk {index + 1}/{len(chunks)} failed: {str(response)}")
+            continue
+        parts.append(response.to_dict())
+    
+    if not parts:
+        raise Exception("Metadata generation failed for every chunk")
+    
+    # Local fields are recomputed over the whole document rather than summed per chunk
+    return DocumentMetadata.from_dict(with_local_fields(merge_metadata(parts), local_fields(text)))
+
+async def agenerate_metadata_many(texts, concurrency=None, timeout=None, use_cache=True, return_exceptions=False):
+    """
+    Generate metadata for many texts concurrently over the pooled HTTP session
+
+    At most ``concurrency`` requests (defaults to METADATA_CONCURRENCY, capped at
+    HTTP_POOL_SIZE) are in flight at once. Results are returned in input order;
+    with return_exceptions=True a failed text yields its exception instead of
+    aborting the whole batch.
+    """
+    concurrency = max(1, min(concurrency or METADATA_CONCURRENCY, HTTP_POOL_SIZE))
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="metadata")
+    
+    async def run(text):
+        async with semaphore:
+            call = functools.partial(generate_metadata, text, use_cache=use_cache, timeout=timeout, chunked=False)
+            return await loop.run_in_executor(executor, call)
+    
+    logger.info(f"Generating metadata for {len(texts)} documents with concurrency {concurrency}")
+    
+    try:
+        return await asyncio.gather(*(run(text) for text in texts), return_exceptions=return_exceptions)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def generate_metadata_many(texts, concurrency=None, timeout=None, use_cache=True, return_exceptions=False):
+    """
+    Synchronous counterpart of agenerate_metadata_many
+
+    Fans out on a thread pool directly rather than through asyncio.run, so it
+    also works from code that already runs an event loop (e.g. Jupyter).
+    Same ordering, concurrency cap and return_exceptions behaviour.
+    """
+    texts = list(texts)
+    concurrency = max(1, min(concurrency or METADATA_CONCURRENCY, HTTP_POOL_SIZE))
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="metadata")
+    
+    logger.info(f"Generating metadata for {len(texts)} documents with concurrency {concurrency}")
+    
+    try:
+        futures = [
+            executor.submit(generate_metadata, text, use_cache=use_cache, timeout=timeout, chunked=False)
+            for text in texts
+        ]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+        return results
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
 def test_metadata_generation():
     """
     Test function to verify metadata generation works
@@ -186,7 +709,7 @@ def test_metadata_generation():
         print("Testing metadata generation...")
         result = generate_metadata(test_text)
         print("✅ Metadata generation successful!")
-        print(f"Result preview: {result[:200]}...")
+        print(f"Result preview: {result.to_json()[:200]}...")
         return True
     except Exception as e:
         print(f"❌ Metadata generation failed: {str(e)}")
@@ -194,30 +717,9 @@ def test_metadata_generation():
 
 def validate_json_response(response_text):
     """
-    Validate and clean JSON response from API
+    Parse the JSON object in an API response, repairing malformed or truncated output
     """
-    try:
-        # Try to parse as-is first
-        return json.loads(response_text)
-    except json.JSONDecodeError:
-        # Try to extract JSON from markdown code blocks
-        import re
-        json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', response_text, re.DOTALL | re.IGNORECASE)
-        if json_match:
-            try:
-                return json.loads(json_match.group(1))
-            except json.JSONDecodeError:
-                pass
-        
-        # Try to find JSON object in the text
-        json_match = re.search(r'(\{.*\})', response_text, re.DOTALL)
-        if json_match:
-            try:
-                return json.loads(json_match.group(1))
-            except json.JSONDecodeError:
-                pass
-        
-        raise ValueError("No valid JSON found in response")
+    return parse_partial_json(response_text)
 
 # Alternative models you can use (uncomment to switch):
 # MODEL = "openai/gpt-3.5-turbo"
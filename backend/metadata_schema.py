@@ -0,0 +1,316 @@
+import json
+import logging
+import re
+from dataclasses import asdict, dataclass, field
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+YES_NO = ("Yes", "No")
+CONFIDENTIAL_CHOICES = ("Yes", "No", "Uncertain")
+SENTIMENTS = ("Positive", "Negative", "Neutral")
+QUALITY_LEVELS = ("High", "Medium", "Low")
+TECHNICAL_LEVELS = ("Beginner", "Intermediate", "Advanced")
+ENTITY_KINDS = ("people", "organizations", "locations")
+CONTENT_FEATURES = ("has_tables", "has_charts", "has_images", "has_references")
+
+# Metadata fields in prompt order: kind, description for the model, and allowed values for choices
+FIELDS = {
+    "title": {"kind": "string", "description": "Document title (infer if not explicitly stated)"},
+    "keywords": {"kind": "list", "description": "5 keywords"},
+    "summary": {"kind": "string", "description": "2-3 sentence summary of the document"},
+    "document_category": {"kind": "string", "description": "Category (e.g., Legal, Academic, Finance, Health, Technical, Business, Personal, etc.)"},
+    "language": {"kind": "string", "description": "Primary language of the document"},
+    "sentiment": {"kind": "choice", "choices": SENTIMENTS, "description": "Overall sentiment"},
+    "named_entities": {"kind": "entities", "description": "People, organizations and locations mentioned"},
+    "confidential": {"kind": "choice", "choices": CONFIDENTIAL_CHOICES, "description": "Whether the document contains sensitive information"},
+    "important_dates": {"kind": "list", "description": "Important dates mentioned"},
+    "document_structure": {"kind": "list", "description": "Main sections of the document"},
+    "author": {"kind": "string", "description": "Author name if mentioned or 'Not specified'"},
+    "intended_audience": {"kind": "string", "description": "Target audience (e.g., General Public, Professionals, Students, etc.)"},
+    "estimated_reading_time": {"kind": "integer", "description": "Reading time in minutes"},
+    "content_features": {"kind": "features", "description": "Whether the document has tables, charts, images and references"},
+    "topic_tags": {"kind": "list", "description": "3 topic tags"},
+    "key_points": {"kind": "list", "description": "3 key points"},
+    "document_quality": {"kind": "choice", "choices": QUALITY_LEVELS, "description": "Assessment of document quality"},
+    "technical_level": {"kind": "choice", "choices": TECHNICAL_LEVELS, "description": "Technical complexity"},
+    "word_count": {"kind": "integer", "description": "Estimated word count"},
+}
+
+@dataclass
+class NamedEntities:
+    people: list = field(default_factory=list)
+    organizations: list = field(default_factory=list)
+    locations: list = field(default_factory=list)
+
+@dataclass
+class ContentFeatures:
+    has_tables: str = "No"
+    has_charts: str = "No"
+    has_images: str = "No"
+    has_references: str = "No"
+
+@dataclass
+class DocumentMetadata:
+    """
+    Validated document metadata; fields absent from the model's answer keep these defaults
+    """
+    title: str = "Untitled"
+    keywords: list = field(default_factory=list)
+    summary: str = ""
+    document_category: str = "Not specified"
+    language: str = "Not specified"
+    sentiment: str = "Neutral"
+    named_entities: NamedEntities = field(default_factory=NamedEntities)
+    confidential: str = "Uncertain"
+    important_dates: list = field(default_factory=list)
+    document_structure: list = field(default_factory=list)
+    author: str = "Not specified"
+    intended_audience: str = "Not specified"
+    estimated_reading_time: int = 0
+    content_features: ContentFeatures = field(default_factory=ContentFeatures)
+    topic_tags: list = field(default_factory=list)
+    key_points: list = field(default_factory=list)
+    document_quality: str = "Medium"
+    technical_level: str = "Intermediate"
+    word_count: int = 0
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Build from a model answer, keeping valid fields and defaulting the rest
+        """
+        values, _ = validate_metadata(data)
+        if "named_entities" in values:
+            values["named_entities"] = NamedEntities(**values["named_entities"])
+        if "content_features" in values:
+            values["content_features"] = ContentFeatures(**values["content_features"])
+        return cls(**values)
+
+    @classmethod
+    def partial(cls, data):
+        """
+        Build from locally computed values only; every other field is None (unknown) rather than a default
+        """
+        values, _ = validate_metadata(data, list(data))
+        metadata = cls(**{name: None for name in FIELDS})
+        for name, value in values.items():
+            setattr(metadata, name, value)
+        if "named_entities" in values:
+            metadata.named_entities = NamedEntities(**values["named_entities"])
+        if "content_features" in data:
+            flags = {name: value for name, value in data["content_features"].items() if value in YES_NO}
+            metadata.content_features = ContentFeatures(**{name: flags.get(name) for name in CONTENT_FEATURES})
+        return metadata
+
+    def to_dict(self):
+        return asdict(self)
+
+    def to_json(self, indent=2):
+        return json.dumps(self.to_dict(), indent=indent)
+
+def _string(value, spec):
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)) or not str(value).strip():
+        raise ValueError("expected a non-empty string")
+    return str(value).strip()
+
+def _list(value, spec):
+    if isinstance(value, str):
+        value = re.split(r"[,;\n]", value)
+    if not isinstance(value, list):
+        raise ValueError("expected a list of strings")
+    return [str(item).strip() for item in value if isinstance(item, (str, int, float)) and str(item).strip()]
+
+def _integer(value, spec):
+    if isinstance(value, bool):
+        raise ValueError("expected an integer")
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = re.search(r"\d[\d,]*", str(value or ""))
+    if not match:
+        raise ValueError("expected an integer")
+    return int(match.group().replace(",", ""))
+
+def _choice(value, spec):
+    text = str(value or "").strip().lower()
+    for choice in spec["choices"]:
+        # Accept answers such as "yes - contains salaries" or "neutral."
+        if text == choice.lower() or text.startswith(choice.lower() + " ") or text.rstrip(".") == choice.lower():
+            return choice
+    raise ValueError(f"expected one of {', '.join(spec['choices'])}")
+
+def _entities(value, spec):
+    if not isinstance(value, dict):
+        raise ValueError("expected an object with people, organizations and locations")
+    return {kind: _list(value.get(kind) or [], spec) for kind in ENTITY_KINDS}
+
+def _features(value, spec):
+    if not isinstance(value, dict):
+        raise ValueError("expected an object of Yes/No flags")
+    return {name: _choice(value.get(name, "No"), {"choices": YES_NO}) for name in CONTENT_FEATURES}
+
+_VALIDATORS = {
+    "string": _string,
+    "list": _list,
+    "integer": _integer,
+    "choice": _choice,
+    "entities": _entities,
+    "features": _features,
+}
+
+def validate_metadata(data, names=None):
+    """
+    Coerce a parsed model answer to the schema
+
+    Returns (values, problems): values holds every field that validated, and
+    problems maps each missing or invalid field name to the reason. Only
+    ``names`` are checked when given.
+    """
+    values = {}
+    problems = {}
+    data = data if isinstance(data, dict) else {}
+    for name in names or FIELDS:
+        spec = FIELDS[name]
+        if data.get(name) is None:
+            problems[name] = "missing"
+            continue
+        try:
+            values[name] = _VALIDATORS[spec["kind"]](data[name], spec)
+        except ValueError as e:
+            problems[name] = str(e)
+    return values, problems
+
+def _field_schema(spec):
+    kind = spec["kind"]
+    if kind == "string":
+        return {"type": "string"}
+    if kind == "list":
+        return {"type": "array", "items": {"type": "string"}}
+    if kind == "integer":
+        return {"type": "integer"}
+    if kind == "choice":
+        return {"type": "string", "enum": list(spec["choices"])}
+    if kind == "entities":
+        properties = {name: {"type": "array", "items": {"type": "string"}} for name in ENTITY_KINDS}
+    else:
+        properties = {name: {"type": "string", "enum": list(YES_NO)} for name in CONTENT_FEATURES}
+    return {"type": "object", "properties": properties, "required": list(properties), "additionalProperties": False}
+
+def metadata_json_schema(names=None):
+    """
+    JSON Schema for the metadata object (or a subset of its fields) for structured-output requests
+    """
+    names = list(names or FIELDS)
+    return {
+        "type": "object",
+        "properties": {name: _field_schema(FIELDS[name]) for name in names},
+        "required": names,
+        "additionalProperties": False,
+    }
+
+def describe_fields(names):
+    """
+    One line per field for prompts: name, description and expected value type
+    """
+    lines = []
+    for name in names:
+        spec = FIELDS[name]
+        kind = spec["kind"]
+        if kind == "choice":
+            expected = " / ".join(spec["choices"])
+        elif kind == "entities":
+            expected = 'object with "people", "organizations", "locations" lists'
+        elif kind == "features":
+            expected = f"object with {', '.join(CONTENT_FEATURES)} set to Yes or No"
+        else:
+            expected = {"string": "string", "list": "list of strings", "integer": "integer"}[kind]
+        lines.append(f'- "{name}": {spec["description"]} ({expected})')
+    return "\n".join(lines)
+
+_decoder = json.JSONDecoder()
+
+def _closers(stack):
+    return "".join(reversed(stack))
+
+def _strip_trailing_comma(out):
+    while out and out[-1].isspace():
+        out.pop()
+    if out and out[-1] == ",":
+        out.pop()
+
+def parse_partial_json(text):
+    """
+    Parse the first JSON object in a model response, repairing it when needed
+
+    Leading prose and code fences are skipped and trailing text is ignored. A
+    single incremental pass escapes raw newlines inside strings and drops
+    trailing commas; if the object is cut off (e.g. by max_tokens) it is closed
+    at the end, or at the last complete member when the tail is unusable.
+    Raises ValueError when no object can be recovered.
+    """
+    start = text.find("{") if text else -1
+    if start < 0:
+        raise ValueError("No JSON object found in response")
+
+    # Fast path: well-formed JSON, possibly wrapped in prose or a code fence
+    try:
+        value, _ = _decoder.raw_decode(text, start)
+        if isinstance(value, dict):
+            return value
+    except json.JSONDecodeError:
+        pass
+
+    out = []
+    stack = []
+    safe = []  # (prefix length, closers) pairs that form complete JSON
+    in_string = escape = False
+    for ch in text[start:]:
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            elif ch == "\n":
+                ch = "\\n"
+            out.append(ch)
+        elif ch == '"':
+            in_string = True
+            out.append(ch)
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+            out.append(ch)
+            safe.append((len(out), _closers(stack)))
+        elif ch in "}]":
+            _strip_trailing_comma(out)
+            if stack:
+                out.append(stack.pop())
+            if not stack:
+                break
+            safe.append((len(out), _closers(stack)))
+        elif ch == ",":
+            _strip_trailing_comma(out)
+            safe.append((len(out), _closers(stack)))
+            out.append(ch)
+        else:
+            out.append(ch)
+
+    candidates = []
+    if not stack:
+        candidates.append("".join(out))
+    else:
+        tail = out + (['"'] if in_string else [])
+        _strip_trailing_comma(tail)
+        candidates.append("".join(tail) + _closers(stack))
+        candidates.extend("".join(out[:length]) + closers for length, closers in reversed(safe))
+
+    for candidate in candidates:
+        try:
+            value = json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(value, dict):
+            return value
+    raise ValueError("No valid JSON found in response")
@@ -1,11 +1,16 @@
 import os
 import cv2
 import pytesseract
-from pdf2image import convert_from_path
-import tempfile
+import fitz  # PyMuPDF
 from PIL import Image
 import numpy as np
 import logging
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from backend.cache import get_extraction_cache, hash_bytes, hash_file
+from backend.layout import detect_text_regions, text_coverage
+from backend.preprocess import DEFAULT_PROFILE, Preprocessor
+from backend.tesseract import TESSERACT_POOL_SIZE, create_backend
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -15,141 +20,469 @@ logger = logging.getLogger(__name__)
 # Windows users: Uncomment and adjust path
 pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
 
-# Poppler path for pdf2image (Windows users: adjust path)
-POPPLER_PATH = r"C:\poppler-24.08.0\Library\bin"
-#POPPLER_PATH = None  # Set to None for Linux/Mac, or specify path for Windows
+# OCR settings (these also key the extraction cache)
+OCR_LANG = "eng"
+OCR_DPI = 300
+OCR_OEM = 3
+OCR_PSM = 6
+# Characters Tesseract may output; empty allows everything in the language data (quotes, accents, ...)
+CHAR_WHITELIST = os.getenv("OCR_CHAR_WHITELIST", "")
+TESSERACT_CONFIG = f"--oem {OCR_OEM} --psm {OCR_PSM}" + (f" -c tessedit_char_whitelist={CHAR_WHITELIST}" if CHAR_WHITELIST else "")
+
+# Confidence-driven recognition: one full pass, then targeted re-OCR of weak lines
+OCR_MIN_CONFIDENCE = 60  # Mean word confidence (0-100) considered good enough for a line
+OCR_RETRY_PSMS = (7, 13)  # Single line, then raw line: alternative modes for weak lines
+OCR_SPARSE_PSM = 11  # Sparse text, used once when the first pass finds no words
+OCR_MAX_RETRIES = 8  # Upper bound on line re-OCR passes per image
+OCR_LINE_PADDING = 4  # Pixels of context kept around a re-OCR'd line
+
+# Region-level OCR: detect text blocks first and OCR only those crops
+OCR_REGIONS = os.getenv("OCR_REGIONS", "0") == "1"
+OCR_REGIONS_MAX_COVERAGE = 0.6  # Denser pages are cheaper to OCR as a whole
+
+# Number of worker processes used to OCR scanned PDF pages (1 = serial)
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", os.cpu_count() or 1))
+
+# Preprocessing profile: "fast", "balanced" or "quality" (see backend/preprocess.py)
+OCR_PREPROCESS_PROFILE = os.getenv("OCR_PREPROCESS_PROFILE", DEFAULT_PROFILE)
+
+_default_preprocessor = Preprocessor(OCR_PREPROCESS_PROFILE)
 
 def preprocess_image(image):
     """
-    Preprocess image for better OCR results
+    Preprocess image for better OCR results using the configured profile
+
+    Returns a new array; the engine itself works on the preprocessor's reused buffers.
     """
-    try:
-        # Convert to grayscale
-        if len(image.shape) == 3:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    return _default_preprocessor(image).copy()
+
+def _group_lines(data):
+    """
+    Group word-level OCR data into lines with their words, confidences and bounding box
+    """
+    lines = {}
+    for i, word in enumerate(data["text"]):
+        conf = float(data["conf"][i])
+        if conf < 0 or not str(word).strip():
+            continue
+        key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        left, top = data["left"][i], data["top"][i]
+        right, bottom = left + data["width"][i], top + data["height"][i]
+        line = lines.get(key)
+        if line is None:
+            lines[key] = {"key": key, "words": [str(word)], "confs": [conf], "box": [left, top, right, bottom]}
         else:
-            gray = image
+            line["words"].append(str(word))
+            line["confs"].append(conf)
+            box = line["box"]
+            line["box"] = [min(box[0], left), min(box[1], top), max(box[2], right), max(box[3], bottom)]
+    
+    for line in lines.values():
+        line["conf"] = sum(line["confs"]) / len(line["confs"])
+    return list(lines.values())
+
+def _mean_confidence(lines):
+    """
+    Mean confidence over all words in the given lines (0 when empty)
+    """
+    confs = [conf for line in lines for conf in line["confs"]]
+    return sum(confs) / len(confs) if confs else 0.0
+
+def _lines_to_text(lines):
+    """
+    Join lines back into text, with a blank line between blocks/paragraphs
+    """
+    text = ""
+    previous = None
+    for line in lines:
+        if previous is not None:
+            text += "\n\n" if line["key"][:2] != previous[:2] else "\n"
+        text += " ".join(line["words"])
+        previous = line["key"]
+    return text.strip()
+
+class OCREngine:
+    """
+    Single OCR engine shared by image, scanned-PDF and mixed-PDF extraction
+
+    PDF pages are rasterized with PyMuPDF (no poppler subprocess), every image
+    goes through the same preprocessing chain, and Tesseract runs with one
+    configuration. Create the engine once per process and reuse it: with the
+    tesserocr backend it keeps Tesseract loaded between calls.
+    """
+
+    def __init__(self, lang=OCR_LANG, psm=OCR_PSM, oem=OCR_OEM, whitelist=CHAR_WHITELIST,
+                 preprocessors=None, dpi=OCR_DPI, backend=None, regions=OCR_REGIONS):
+        self.lang = lang
+        self.psm = psm
+        self.oem = oem
+        self.whitelist = whitelist
+        self.dpi = dpi
+        self.preprocessors = list(preprocessors) if preprocessors is not None else [_default_preprocessor]
+        self.backend = backend or create_backend(lang, oem)
+        self.regions = regions
+
+    def settings(self):
+        """
+        Settings that affect OCR output, used to key the extraction cache
+        """
+        return {
+            "lang": self.lang,
+            "psm": self.psm,
+            "oem": self.oem,
+            "whitelist": self.whitelist,
+            "preprocessors": [step.__name__ for step in self.preprocessors],
+            "dpi": self.dpi,
+            "regions": self.regions,
+        }
+
+    def preprocess(self, image):
+        """
+        Run the image through each preprocessing step in order
+        """
+        for step in self.preprocessors:
+            image = step(image)
+        return image
+
+    def recognize(self, image):
+        """
+        Preprocess and OCR an image array; returns the stripped text, possibly empty
+        """
+        return self.recognize_data(image)["text"]
+
+    def recognize_data(self, image):
+        """
+        Confidence-driven OCR returning text, mean word confidence and Tesseract passes used
+
+        A single image_to_data pass is made with the configured PSM. Lines whose
+        mean word confidence is below OCR_MIN_CONFIDENCE are cropped and re-read
+        with the alternative OCR_RETRY_PSMS, weakest first, moving on as soon as
+        a line reaches the threshold. A page with no words at all gets one
+        sparse-text pass. Worst case is 2 full passes plus OCR_MAX_RETRIES small
+        crops, instead of up to five full passes.
+
+        With region mode enabled, sparse pages are OCR'd region by region instead
+        (see recognize_regions); dense pages still take the whole-page path.
+        """
+        processed = self.preprocess(image)
         
-        # Resize image for better OCR (increase resolution)
-        height, width = gray.shape
-        if width < 1000:
-            scale_factor = 1000 / width
-            new_width = int(width * scale_factor)
-            new_height = int(height * scale_factor)
-            gray = cv2.resize(gray, (new_width, new_height), interpolation=cv2.INTER_CUBIC)
+        if self.regions:
+            regions = detect_text_regions(processed)
+            if regions and text_coverage(regions, processed.shape) <= OCR_REGIONS_MAX_COVERAGE:
+                results = self._ocr_regions(processed, regions)
+                words = sum(result["words"] for result in results)
+                return {
+                    "text": "\n\n".join(result["text"] for result in results),
+                    "confidence": sum(r["confidence"] * r["words"] for r in results) / words if words else 0.0,
+                    "passes": len(regions),
+                }
         
-        # Apply Gaussian blur to reduce noise
-        gray = cv2.GaussianBlur(gray, (3, 3), 0)
+        whitelist = {"tessedit_char_whitelist": self.whitelist}
         
-        # Apply adaptive thresholding
-        gray = cv2.adaptiveThreshold(
-            gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 2
-        )
+        lines = _group_lines(self.backend.image_to_data(processed, self.psm, whitelist))
+        passes = 1
         
-        # Morphological operations to clean up the image
-        kernel = np.ones((1, 1), np.uint8)
-        gray = cv2.morphologyEx(gray, cv2.MORPH_CLOSE, kernel)
-        gray = cv2.morphologyEx(gray, cv2.MORPH_OPEN, kernel)
+        if not lines:
+            # Nothing found with the layout PSM; try once for sparse, scattered text
+            lines = _group_lines(self.backend.image_to_data(processed, OCR_SPARSE_PSM, {"tessedit_char_whitelist": ""}))
+            passes += 1
         
-        return gray
+        weakest = sorted((line for line in lines if line["conf"] < OCR_MIN_CONFIDENCE), key=lambda line: line["conf"])
+        budget = OCR_MAX_RETRIES
+        for line in weakest:
+            if budget <= 0:
+                break
+            left, top, right, bottom = line["box"]
+            pad = OCR_LINE_PADDING
+            crop = processed[max(0, top - pad):bottom + pad, max(0, left - pad):right + pad]
+            if crop.size == 0:
+                continue
+            
+            for psm in OCR_RETRY_PSMS:
+                if budget <= 0:
+                    break
+                retry = _group_lines(self.backend.image_to_data(crop, psm, {"tessedit_char_whitelist": ""}))
+                budget -= 1
+                passes += 1
+                if retry and _mean_confidence(retry) > line["conf"]:
+                    line["words"] = [word for retry_line in retry for word in retry_line["words"]]
+                    line["confs"] = [conf for retry_line in retry for conf in retry_line["confs"]]
+                    line["conf"] = _mean_confidence(retry)
+                if line["conf"] >= OCR_MIN_CONFIDENCE:
+                    break
         
-    except Exception as e:
-        logger.error(f"Error in image preprocessing: {str(e)}")
+        return {"text": _lines_to_text(lines), "confidence": _mean_confidence(lines), "passes": passes}
+
+    def recognize_regions(self, image, workers=None):
+        """
+        Detect text regions and OCR each crop, returning text with bounding boxes
+
+        Each result has ``box`` (x, y, w, h in the input image's coordinates),
+        ``psm``, ``text``, ``confidence`` and ``seconds`` spent on that region.
+        Crops are OCR'd on up to ``workers`` threads (default TESSERACT_POOL_SIZE).
+        """
+        processed = self.preprocess(image)
+        results = self._ocr_regions(processed, detect_text_regions(processed), workers)
+        
+        # Preprocessing may upscale; report boxes in the caller's coordinates
+        scale_x = image.shape[1] / processed.shape[1]
+        scale_y = image.shape[0] / processed.shape[0]
+        for result in results:
+            x, y, w, h = result["box"]
+            result["box"] = (round(x * scale_x), round(y * scale_y), round(w * scale_x), round(h * scale_y))
+        return results
+
+    def _ocr_regions(self, processed, regions, workers=None):
+        """
+        OCR region crops in parallel, keeping reading order and dropping empty regions
+        """
+        whitelist = {"tessedit_char_whitelist": self.whitelist}
+        
+        def ocr_region(region):
+            x, y, w, h = region["box"]
+            started = time.perf_counter()
+            lines = _group_lines(self.backend.image_to_data(processed[y:y + h, x:x + w], region["psm"], whitelist))
+            return {
+                "box": region["box"],
+                "psm": region["psm"],
+                "text": _lines_to_text(lines),
+                "confidence": _mean_confidence(lines),
+                "words": sum(len(line["words"]) for line in lines),
+                "seconds": round(time.perf_counter() - started, 4),
+            }
+        
+        workers = max(1, min(workers or TESSERACT_POOL_SIZE, len(regions) or 1))
+        if workers == 1:
+            results = [ocr_region(region) for region in regions]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(ocr_region, regions))
+        return [result for result in results if result["text"]]
+
+    def render_page(self, page, dpi=None, clip=None):
+        """
+        Rasterize a PyMuPDF page (optionally clipped) to a grayscale NumPy array
+        """
+        pix = page.get_pixmap(dpi=dpi or self.dpi, clip=clip, colorspace=fitz.csGRAY, alpha=False)
+        image = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.stride)
+        return image[:, :pix.width]
+
+    def ocr_page(self, page, dpi=None, clip=None):
+        """
+        Rasterize and OCR a PyMuPDF page
+        """
+        return self.recognize(self.render_page(page, dpi=dpi, clip=clip))
+
+    def iter_pdf_pages(self, pdf_path, dpi=None, first_page=1, last_page=None):
+        """
+        Yield (page_number, image) pairs, rendering one page at a time
+
+        Only the current page image is alive at any point, so memory stays flat
+        regardless of document length. A page that fails to render is logged and skipped.
+        """
+        with fitz.open(pdf_path) as doc:
+            last_page = min(last_page or len(doc), len(doc))
+            for page_number in range(first_page, last_page + 1):
+                try:
+                    image = self.render_page(doc[page_number - 1], dpi=dpi)
+                except Exception as raster_error:
+                    logger.warning(f"Error rasterizing page {page_number}: {str(raster_error)}")
+                    continue
+                yield page_number, image
+
+_engine = None
+
+def get_ocr_engine():
+    """
+    Return the process-wide OCR engine
+    """
+    global _engine
+    if _engine is None:
+        _engine = OCREngine()
+    return _engine
+
+def load_image(data):
+    """
+    Decode raw bytes, a PIL image or a NumPy array into an OpenCV image array
+    """
+    if isinstance(data, np.ndarray):
+        return data
+    
+    if isinstance(data, Image.Image):
+        if data.mode not in ("L", "RGB"):
+            data = data.convert("RGB")
+        image = np.asarray(data)
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
         return image
+    
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError("Could not decode image data")
+        return image
+    
+    raise TypeError(f"Unsupported image input: {type(data).__name__}. Expected bytes, PIL image or NumPy array")
 
-def ocr_image(image_path):
+def _ocr_cache_settings(operation, **extra):
     """
-    Extract text from image using OCR
+    Settings that affect OCR output, used to key the extraction cache
+    """
+    return dict(get_ocr_engine().settings(), operation=operation, **extra)
+
+def ocr_image_data(data, use_cache=True):
+    """
+    Extract text from an in-memory image (bytes, PIL image or NumPy array) using OCR
+
+    Encoded image bytes are looked up in the extraction cache by content hash.
     """
     try:
-        # Read image
-        image = cv2.imread(image_path)
-        if image is None:
-            raise ValueError(f"Could not read image: {image_path}")
-        
-        # Preprocess image
-        processed = preprocess_image(image)
-        
-        # OCR configuration for better results
-        custom_config = r'--oem 3 --psm 6 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz!@#$%^&*()_+-=[]{}|;:,.<>?/~ '
+        cache = get_extraction_cache() if use_cache and isinstance(data, (bytes, bytearray, memoryview)) else None
+        if cache:
+            key = cache.make_key(hash_bytes(data), _ocr_cache_settings("ocr_image"))
+            cached = cache.get(key)
+            if cached is not None:
+                logger.info("Using cached OCR result")
+                return cached
         
-        # Extract text
-        text = pytesseract.image_to_string(processed, lang='eng', config=custom_config)
-        
-        # Clean up text
-        text = text.strip()
+        text = get_ocr_engine().recognize(load_image(data))
         if not text:
-            # Try with different PSM modes if no text found
-            for psm in [3, 6, 8, 13]:
-                try:
-                    config = f'--oem 3 --psm {psm}'
-                    text = pytesseract.image_to_string(processed, lang='eng', config=config)
-                    if text.strip():
-                        break
-                except:
-                    continue
+            # Not cached: an empty result may come from a broken OCR setup
+            return "No text could be extracted from this image."
         
-        return text if text.strip() else "No text could be extracted from this image."
+        if cache:
+            cache.set(key, text)
+        return text
         
     except Exception as e:
         logger.error(f"Error in OCR processing: {str(e)}")
         raise Exception(f"OCR failed: {str(e)}")
 
-def ocr_scanned_pdf(pdf_path):
+def ocr_image_regions(data, workers=None):
+    """
+    Region-level OCR of an in-memory image: text, bounding box and timing per detected block
+    """
+    try:
+        return get_ocr_engine().recognize_regions(load_image(data), workers=workers)
+    except Exception as e:
+        logger.error(f"Error in region OCR processing: {str(e)}")
+        raise Exception(f"Region OCR failed: {str(e)}")
+
+def ocr_image(image_path, use_cache=True):
+    """
+    Extract text from image file using OCR
+    """
+    try:
+        with open(image_path, "rb") as f:
+            data = f.read()
+    except Exception as e:
+        logger.error(f"Error in OCR processing: {str(e)}")
+        raise Exception(f"OCR failed: Could not read image: {image_path}")
+    
+    return ocr_image_data(data, use_cache=use_cache)
+
+def get_pdf_page_count(pdf_path):
+    """
+    Return the number of pages in a PDF without rasterizing it
+    """
+    with fitz.open(pdf_path) as doc:
+        return len(doc)
+
+def iter_pdf_pages(pdf_path, dpi=OCR_DPI, first_page=1, last_page=None):
+    """
+    Yield (page_number, image) pairs for a PDF, rendering one page at a time
+    """
+    return get_ocr_engine().iter_pdf_pages(pdf_path, dpi=dpi, first_page=first_page, last_page=last_page)
+
+def _init_ocr_worker():
+    """
+    Limit Tesseract to one thread per worker so processes don't oversubscribe cores
+    """
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+def _ocr_pdf_page(pdf_path, page_number, dpi):
+    """
+    Rasterize and OCR a single PDF page (runs inside a worker process)
+    """
+    with fitz.open(pdf_path) as doc:
+        return get_ocr_engine().ocr_page(doc[page_number - 1], dpi=dpi)
+
+NO_PDF_TEXT_MESSAGE = "No text could be extracted from this PDF."
+
+def _ocr_pages_serial(pdf_path, page_count, dpi):
+    """
+    Stream pages through OCR one at a time in the current process
+    """
+    engine = get_ocr_engine()
+    results = {}
+    for page_number, image in engine.iter_pdf_pages(pdf_path, dpi=dpi, last_page=page_count):
+        try:
+            results[page_number] = engine.recognize(image)
+        except Exception as page_error:
+            logger.warning(f"Error processing page {page_number}: {str(page_error)}")
+    return results
+
+def _ocr_pages_parallel(pdf_path, page_count, dpi, workers):
+    """
+    OCR pages on a bounded process pool, isolating failures per page
+
+    Each worker rasterizes its own page, so page images never cross process
+    boundaries and memory stays flat at one page per worker.
+    """
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_ocr_worker) as pool:
+        futures = {
+            pool.submit(_ocr_pdf_page, pdf_path, page_number, dpi): page_number
+            for page_number in range(1, page_count + 1)
+        }
+        for future in as_completed(futures):
+            page_number = futures[future]
+            try:
+                results[page_number] = future.result()
+            except Exception as page_error:
+                logger.warning(f"Error processing page {page_number}: {str(page_error)}")
+    return results
+
+def ocr_scanned_pdf(pdf_path, workers=None, dpi=OCR_DPI):
     """
     Extract text from scanned PDF using OCR
+
+    Pages are OCR'd on a pool of ``workers`` processes (defaults to OCR_WORKERS);
+    pass workers=1 to process pages serially.
+    """
+    return _ocr_scanned_pdf(pdf_path, workers, dpi)[0]
+
+def _ocr_scanned_pdf(pdf_path, workers=None, dpi=OCR_DPI):
+    """
+    ocr_scanned_pdf returning (text, complete); complete is False if any page failed
     """
     try:
         text = ""
+        page_count = get_pdf_page_count(pdf_path)
+        workers = min(max(1, workers or OCR_WORKERS), page_count) or 1
         
-        with tempfile.TemporaryDirectory() as temp_dir:
-            logger.info("Converting PDF pages to images...")
-            
-            # Convert PDF to images
-            if POPPLER_PATH:
-                images = convert_from_path(
-                    pdf_path,
-                    dpi=300,
-                    output_folder=temp_dir,
-                    poppler_path=POPPLER_PATH
-                )
-            else:
-                images = convert_from_path(
-                    pdf_path,
-                    dpi=300,
-                    output_folder=temp_dir
-                )
-            
-            logger.info(f"Processing {len(images)} pages with OCR...")
-            
-            for i, img in enumerate(images):
-                try:
-                    # Save image temporarily
-                    img_path = os.path.join(temp_dir, f"page_{i+1}.png")
-                    img.save(img_path, "PNG")
-                    
-                    # Extract text from image
-                    page_text = ocr_image(img_path)
-                    
-                    if page_text.strip():
-                        text += f"\n--- Page {i+1} ---\n"
-                        text += page_text + "\n"
-                    
-                    # Clean up individual image file
-                    if os.path.exists(img_path):
-                        os.remove(img_path)
-                        
-                except Exception as page_error:
-                    logger.warning(f"Error processing page {i+1}: {str(page_error)}")
-                    continue
+        logger.info(f"Processing {page_count} pages with OCR using {workers} worker(s)...")
+        
+        if workers > 1:
+            results = _ocr_pages_parallel(pdf_path, page_count, dpi, workers)
+        else:
+            results = _ocr_pages_serial(pdf_path, page_count, dpi)
         
-        return text.strip() if text.strip() else "No text could be extracted from this PDF."
+        # Assemble output in page order regardless of completion order
+        for page_number in sorted(results):
+            page_text = results[page_number]
+            if page_text.strip():
+                text += f"\n--- Page {page_number} ---\n"
+                text += page_text + "\n"
+        
+        complete = len(results) == page_count
+        return (text.strip() if text.strip() else NO_PDF_TEXT_MESSAGE), complete
         
     except Exception as e:
         logger.error(f"Error in PDF OCR processing: {str(e)}")
         raise Exception(f"PDF OCR failed: {str(e)}")
 
-def extract_text_from_image(path):
+def extract_text_from_image(path, workers=None, use_cache=True):
     """
     Main function to extract text from images or scanned PDFs
     """
@@ -164,9 +497,24 @@ def extract_text_from_image(path):
     logger.info(f"Processing {ext} file for OCR: {os.path.basename(path)}")
     
     if ext in [".png", ".jpg", ".jpeg", ".bmp", ".tiff", ".tif"]:
-        return ocr_image(path)
+        return ocr_image(path, use_cache=use_cache)
     elif ext == ".pdf":
-        return ocr_scanned_pdf(path)
+        cache = get_extraction_cache() if use_cache else None
+        if cache:
+            key = cache.make_key(hash_file(path), _ocr_cache_settings("ocr_scanned_pdf", dpi=OCR_DPI))
+            cached = cache.get(key)
+            if cached is not None:
+                logger.info("Using cached OCR result")
+                return cached
+        
+        text, complete = _ocr_scanned_pdf(path, workers=workers)
+        
+        # Degraded results are not cached, so the file is OCR'd again once the setup is fixed
+        if cache and complete and text != NO_PDF_TEXT_MESSAGE:
+            cache.set(key, text)
+        elif cache:
+            logger.warning("Not caching OCR result: some pages failed or no text was found")
+        return text
     else:
         raise ValueError(f"Unsupported image file type: {ext}. Supported formats: PNG, JPG, JPEG, BMP, TIFF, PDF")
 
@@ -178,6 +526,7 @@ def test_ocr_setup():
         # Test tesseract installation
         version = pytesseract.get_tesseract_version()
         logger.info(f"Tesseract version: {version}")
+        logger.info(f"OCR backend: {get_ocr_engine().backend.name}")
         return True
     except Exception as e:
         logger.error(f"Tesseract test failed: {str(e)}")
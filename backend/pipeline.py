@@ -0,0 +1,254 @@
+import os
+import functools
+import json
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from backend.extractor import extract_text
+from backend.ocr import extract_text_from_image
+from backend.dedup import DEDUP_MODE, diff_metadata, document_id, get_duplicate_index, minhash
+from backend.metadata_gen import METADATA_CONCURRENCY, OFFLINE, generate_metadata, reuse_metadata
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".bmp", ".tiff", ".tif"}
+
+# Sentinel passed down the queues once the input is exhausted
+_DONE = object()
+
+class Stage:
+    """
+    One step of a pipeline: ``func`` applied to each item by ``workers`` threads
+
+    With use_processes=True the work itself runs on a process pool of the same
+    size (for CPU-bound steps); the stage threads only hand items over and wait.
+    """
+
+    def __init__(self, name, func, workers=1, use_processes=False):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.use_processes = use_processes
+        self._lock = threading.Lock()
+        self._stats = {"processed": 0, "failed": 0, "busy_seconds": 0.0, "idle_seconds": 0.0, "blocked_seconds": 0.0}
+
+    def _record(self, **deltas):
+        with self._lock:
+            for key, value in deltas.items():
+                self._stats[key] += value
+
+    def stats(self, elapsed):
+        """
+        Counters plus utilization: share of worker time spent doing work
+        """
+        with self._lock:
+            stats = {key: round(value, 3) for key, value in self._stats.items()}
+        capacity = self.workers * elapsed
+        stats["workers"] = self.workers
+        stats["utilization"] = round(stats["busy_seconds"] / capacity, 3) if capacity else 0.0
+        return stats
+
+class Pipeline:
+    """
+    Producer/consumer pipeline with bounded queues between stages
+
+    Each stage pulls from its input queue and pushes to the next; a full queue
+    blocks the upstream stage, so a slow stage applies backpressure instead of
+    letting work pile up in memory. A failing item skips the remaining stages
+    and is reported with the stage where it failed.
+    """
+
+    def __init__(self, stages, queue_size=None):
+        self.stages = stages
+        self.queue_size = queue_size
+        self._started = None
+        self._finished = None
+
+    def run(self, items):
+        """
+        Feed items through every stage, yielding (item, result, error) as they complete
+
+        ``error`` is None on success, otherwise a (stage_name, exception) tuple.
+        Results arrive in completion order, not input order. If ``items``
+        itself raises, the items read so far are finished and then the
+        exception is re-raised here.
+        """
+        queues = [
+            queue.Queue(maxsize=self.queue_size or stage.workers * 2)
+            for stage in self.stages
+        ]
+        queues.append(queue.Queue(maxsize=self.queue_size or self.stages[-1].workers * 2))
+        pools = [
+            ProcessPoolExecutor(max_workers=stage.workers) if stage.use_processes else None
+            for stage in self.stages
+        ]
+        self._started = time.monotonic()
+        self._finished = None
+
+        feed_error = []
+
+        def feed():
+            # Always send the sentinel, so a failing input iterator can't leave run() waiting forever
+            try:
+                for item in items:
+                    queues[0].put((item, item, None))
+            except Exception as e:
+                feed_error.append(e)
+            finally:
+                queues[0].put(_DONE)
+
+        threads = [threading.Thread(target=feed, name="pipeline-feed", daemon=True)]
+        for index, stage in enumerate(self.stages):
+            remaining = [stage.workers]
+            for worker in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=self._work,
+                    args=(stage, pools[index], queues[index], queues[index + 1], remaining),
+                    name=f"pipeline-{stage.name}-{worker}",
+                    daemon=True
+                ))
+
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                entry = queues[-1].get()
+                if entry is _DONE:
+                    break
+                yield entry
+            if feed_error:
+                # Items read before the failure have been processed; surface the input error
+                raise feed_error[0]
+        finally:
+            self._finished = time.monotonic()
+            for pool in pools:
+                if pool:
+                    pool.shutdown(wait=False, cancel_futures=True)
+
+    def _work(self, stage, pool, inbox, outbox, remaining):
+        """
+        Worker loop for one stage thread
+        """
+        while True:
+            waited = time.monotonic()
+            entry = inbox.get()
+            stage._record(idle_seconds=time.monotonic() - waited)
+
+            if entry is _DONE:
+                # Let sibling workers see the sentinel; the last one forwards it downstream
+                inbox.put(_DONE)
+                with stage._lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last:
+                    outbox.put(_DONE)
+                return
+
+            item, value, error = entry
+            if error is None:
+                started = time.monotonic()
+                try:
+                    value = pool.submit(stage.func, value).result() if pool else stage.func(value)
+                    stage._record(processed=1, busy_seconds=time.monotonic() - started)
+                except Exception as e:
+                    value, error = None, (stage.name, e)
+                    stage._record(failed=1, busy_seconds=time.monotonic() - started)
+
+            waited = time.monotonic()
+            outbox.put((item, value, error))
+            stage._record(blocked_seconds=time.monotonic() - waited)
+
+    def stats(self):
+        """
+        Per-stage counters and utilization; the busiest stage is the bottleneck
+        """
+        if self._started is None:
+            return {}
+        elapsed = (self._finished or time.monotonic()) - self._started
+        stages = {stage.name: stage.stats(elapsed) for stage in self.stages}
+        return {
+            "elapsed_seconds": round(elapsed, 1),
+            "bottleneck": max(stages, key=lambda name: stages[name]["utilization"]),
+            "stages": stages,
+        }
+
+    def log_stats(self):
+        """
+        Log a one-line utilization summary per stage
+        """
+        stats = self.stats()
+        for name, stage in stats.get("stages", {}).items():
+            logger.info(
+                f"Stage {name}: {stage['processed']} ok, {stage['failed']} failed, "
+                f"utilization {stage['utilization']:.0%} across {stage['workers']} worker(s), "
+                f"blocked {stage['blocked_seconds']:.1f}s on downstream"
+            )
+        if stats:
+            logger.info(f"Bottleneck stage: {stats['bottleneck']}")
+
+def extract_file(path):
+    """
+    Route a file to the matching extractor
+    """
+    ext = os.path.splitext(path)[-1].lower()
+    if ext in IMAGE_EXTENSIONS:
+        # Files are already processed in parallel, so OCR each one serially
+        return extract_text_from_image(path, workers=1)
+    return extract_text(path, workers=1)
+
+def describe_text(text, offline=None):
+    """
+    Generate validated metadata for extracted text
+
+    Unless DEDUP_MODE is "off", the text is looked up in the near-duplicate
+    index first. A match is reported under "near_duplicate" with the fields
+    that differ from it; in "reuse" mode its metadata is reused (local fields
+    recomputed) instead of calling the model. Identical text seen before, under
+    any path, matches with similarity 1.0. Every result is added to the index.
+    Offline runs skip the index, since their metadata is partial.
+    """
+    if offline is None:
+        offline = OFFLINE
+    index = None if offline else get_duplicate_index()
+    if index is None:
+        metadata = generate_metadata(text, offline=offline)
+        return {"characters": len(text), "metadata": metadata.to_dict()}
+    
+    doc_id = document_id(text)
+    signature = minhash(text)
+    # doc_id hashes the text, so it can't tell a reprocessed file from an exact copy; don't exclude it
+    match = index.nearest(signature)
+    reused = match is not None and DEDUP_MODE == "reuse"
+    if reused:
+        logger.info(f"Reusing metadata of near-duplicate {match.document_id[:12]} ({match.similarity:.0%} similar)")
+        metadata = reuse_metadata(match.metadata, text)
+    else:
+        metadata = generate_metadata(text, offline=offline)
+    index.add(doc_id, signature, metadata.to_json())
+    
+    result = {"characters": len(text), "document_id": doc_id, "metadata": metadata.to_dict()}
+    if match:
+        result["near_duplicate"] = {
+            "document_id": match.document_id,
+            "similarity": round(match.similarity, 3),
+            "reused": reused,
+            "changes": diff_metadata(json.loads(match.metadata), result["metadata"]),
+        }
+    return result
+
+def document_pipeline(extract_workers=None, llm_workers=None, queue_size=None, offline=None):
+    """
+    Two-stage pipeline: CPU-bound extraction/OCR on processes overlapping with network-bound LLM calls
+
+    With offline=True the metadata stage only computes local fields and makes no network calls.
+    """
+    return Pipeline([
+        Stage("extract", extract_file, workers=extract_workers or os.cpu_count() or 1, use_processes=True),
+        Stage("metadata", functools.partial(describe_text, offline=offline), workers=llm_workers or METADATA_CONCURRENCY),
+    ], queue_size=queue_size)
@@ -0,0 +1,277 @@
+import re
+import logging
+import threading
+from collections import Counter
+from backend.metadata_schema import CONTENT_FEATURES, ENTITY_KINDS, FIELDS
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Tokenizer used for counting when tiktoken is installed (close to most chat models' BPE)
+TOKEN_ENCODING = "cl100k_base"
+CHARS_PER_TOKEN = 4  # Fallback estimate without tiktoken
+
+# Repeated header/footer detection
+MAX_HEADER_LINE_CHARS = 80  # Longer lines are body text, even when repeated
+MIN_HEADER_REPEATS = 3  # Short lines seen at the edges of this many pages are running headers/footers
+PAGE_EDGE_LINES = 2  # Lines at the top and bottom of each page checked for running headers/footers
+
+_TRUNCATION_MARK = "... [truncated]"
+
+_encoding = None
+_encoding_lock = threading.Lock()
+
+def count_tokens(text):
+    """
+    Number of tokens in text: exact with tiktoken, otherwise a chars/4 estimate
+    """
+    global _encoding
+    if not text:
+        return 0
+    if tiktoken is not None:
+        with _encoding_lock:
+            if _encoding is None:
+                _encoding = tiktoken.get_encoding(TOKEN_ENCODING)
+        return len(_encoding.encode(text, disallowed_special=()))
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+def budget_cut(text, budget):
+    """
+    Length of the longest prefix of text, ending at a word boundary where possible, within ``budget`` tokens
+    """
+    tokens = count_tokens(text)
+    if tokens <= budget:
+        return len(text)
+    
+    # Scale by the measured chars/token ratio, then shrink until it fits
+    cut = int(len(text) * budget / tokens)
+    while cut > 0:
+        space = text.rfind(" ", 0, cut)
+        cut = space if space > cut // 2 else cut
+        if count_tokens(text[:cut]) <= budget:
+            break
+        cut = int(cut * 0.95)
+    return cut
+
+def fit_to_budget(text, budget):
+    """
+    Cut text at a word boundary so it fits in ``budget`` tokens, marking the cut
+
+    Returns (text, truncated).
+    """
+    if count_tokens(text) <= budget:
+        return text, False
+    cut = budget_cut(text, max(1, budget - count_tokens(_TRUNCATION_MARK)))
+    return text[:cut].rstrip() + _TRUNCATION_MARK, True
+
+# Markers added by the extractors and OCR, which carry no content for the model
+_MARKER_LINE = re.compile(r"^(?:--- Page \d+ ---|\[Page \d+ OCR\]|\[OCR-Extracted Text\])$")
+# Page-number shapes: "12", "- 12 -", "Page 12", "Page 12 of 40" (dropped only at page edges or when repeated)
+_PAGE_NUMBER_LINE = re.compile(r"^(?:page\s*)?[-–\s]*\d+(?:\s*(?:of|/)\s*\d+)?[-–\s]*$", re.IGNORECASE)
+_PUNCTUATION_RUN = re.compile(r"([^\w\s])\1{3,}")
+_SPACES = re.compile(r"[ \t\f\v]+")
+
+def _is_noise(line):
+    """
+    OCR debris: lines with (almost) no letters or digits
+    """
+    alnum = sum(ch.isalnum() for ch in line)
+    return alnum == 0 or (len(line) >= 4 and alnum / len(line) < 0.3)
+
+def compact_text(text):
+    """
+    Strip what costs prompt tokens without informing the metadata
+
+    Removes extractor page markers, page numbers, OCR noise lines and every
+    repeat of running headers and footers: short lines within PAGE_EDGE_LINES
+    of the top or bottom of at least MIN_HEADER_REPEATS pages, identical or
+    differing only by their page's number. Numbered headings ("Chapter 2")
+    are kept. Runs of punctuation such as dot leaders are shortened,
+    whitespace is collapsed and blank lines are merged.
+    """
+    lines = [_SPACES.sub(" ", line).strip() for line in text.splitlines()]
+
+    def header_key(line):
+        return re.sub(r"\d+", "#", line.lower())
+
+    repeats = Counter(header_key(line) for line in lines if line and len(line) <= MAX_HEADER_LINE_CHARS)
+    paginated = any(_MARKER_LINE.match(line) for line in lines)
+
+    def is_page_number(index):
+        """
+        A page-number line next to a page marker, or a decorated one ("Page 3", "- 3 -")
+        that repeats across pages; lone numbers elsewhere may be table values
+        """
+        line = lines[index]
+        if not _PAGE_NUMBER_LINE.match(line):
+            return False
+        for step in (-1, 1):
+            neighbour = index + step
+            while 0 <= neighbour < len(lines) and not lines[neighbour]:
+                neighbour += step
+            # The start and end of paginated text are page edges too
+            if not 0 <= neighbour < len(lines):
+                if paginated:
+                    return True
+            elif _MARKER_LINE.match(lines[neighbour]):
+                return True
+        key = header_key(line)
+        return key != "#" and repeats[key] >= MIN_HEADER_REPEATS
+
+    # Content lines of each page, split on the extractors' page markers
+    pages = [(None, [])]
+    for index, line in enumerate(lines):
+        if _MARKER_LINE.match(line):
+            number = re.search(r"\d+", line)
+            pages.append((number.group() if number else None, []))
+        elif line and not is_page_number(index) and not _is_noise(line):
+            pages[-1][1].append(index)
+
+    # Running headers/footers sit at page edges and are either identical on every
+    # page or differ only by carrying that page's number ("Annual Report - p. 3")
+    edge_keys = {}
+    key_pages = Counter()
+    for number, page in pages:
+        keys = set()
+        for index in set(page[:PAGE_EDGE_LINES] + page[-PAGE_EDGE_LINES:]):
+            line = lines[index]
+            if len(line) > MAX_HEADER_LINE_CHARS:
+                continue
+            if number and re.search(rf"(?<!\d){number}(?!\d)", line):
+                key = header_key(line)
+            else:
+                key = line.lower()
+            edge_keys[index] = key
+            keys.add(key)
+        key_pages.update(keys)
+
+    kept = []
+    seen_headers = set()
+    blank = False
+    for index, line in enumerate(lines):
+        if not line:
+            blank = bool(kept)
+            continue
+        if _MARKER_LINE.match(line) or is_page_number(index) or _is_noise(line):
+            continue
+        key = edge_keys.get(index)
+        if key is not None and key_pages[key] >= MIN_HEADER_REPEATS:
+            if key in seen_headers:
+                continue
+            seen_headers.add(key)
+        if blank:
+            kept.append("")
+            blank = False
+        kept.append(_PUNCTUATION_RUN.sub(r"\1\1\1", line))
+    return "\n".join(kept)
+
+def _compact_field(name):
+    spec = FIELDS[name]
+    kind = spec["kind"]
+    if kind == "choice":
+        return f"{name} ({'/'.join(spec['choices'])})"
+    if kind == "integer":
+        return f"{name} (int)"
+    if kind == "list":
+        return f"{name} []"
+    if kind == "entities":
+        return f"{name} {{{', '.join(ENTITY_KINDS)}: []}}"
+    if kind == "features":
+        return f"{name} {{{', '.join(CONTENT_FEATURES)}: Yes/No}}"
+    return name
+
+def compact_prompt(text, names=None):
+    """
+    Minimal metadata prompt: one line of keys with types instead of the annotated JSON template
+    """
+    keys = ", ".join(_compact_field(name) for name in names or FIELDS)
+    return f"""Return only a JSON object with document metadata. Keys: {keys}. summary: 2-3 sentences; keywords: 5.
+
+Document:
+{text}"""
+
+# Annotated template line for each field of the full prompt
+_TEMPLATE_LINES = {
+    "title": '"title": "Document title (infer if not explicitly stated)"',
+    "keywords": '"keywords": ["keyword1", "keyword2", "keyword3", "keyword4", "keyword5"]',
+    "summary": '"summary": "2-3 sentence summary of the document"',
+    "document_category": '"document_category": "Category (e.g., Legal, Academic, Finance, Health, Technical, Business, Personal, etc.)"',
+    "language": '"language": "Primary language of the document"',
+    "sentiment": '"sentiment": "Overall sentiment (Positive, Negative, Neutral)"',
+    "named_entities": """"named_entities": {
+        "people": ["person1", "person2"],
+        "organizations": ["org1", "org2"],
+        "locations": ["location1", "location2"]
+    }""",
+    "confidential": '"confidential": "Assessment if document contains sensitive information (Yes/No/Uncertain)"',
+    "important_dates": '"important_dates": ["date1", "date2"]',
+    "document_structure": '"document_structure": ["section1", "section2", "section3"]',
+    "author": '"author": "Author name if mentioned or \'Not specified\'"',
+    "intended_audience": '"intended_audience": "Target audience (e.g., General Public, Professionals, Students, etc.)"',
+    "estimated_reading_time": '"estimated_reading_time": "Reading time in minutes (integer)"',
+    "content_features": """"content_features": {
+        "has_tables": "Yes/No",
+        "has_charts": "Yes/No",
+        "has_images": "Yes/No",
+        "has_references": "Yes/No"
+    }""",
+    "topic_tags": '"topic_tags": ["tag1", "tag2", "tag3"]',
+    "key_points": '"key_points": ["point1", "point2", "point3"]',
+    "document_quality": '"document_quality": "Assessment of document quality (High/Medium/Low)"',
+    "technical_level": '"technical_level": "Technical complexity (Beginner/Intermediate/Advanced)"',
+    "word_count": '"word_count": "Estimated word count (integer)"',
+}
+
+def full_prompt(text, names=None):
+    """
+    Verbose metadata prompt with an annotated JSON template of ``names`` (default: every field)
+    """
+    template = ",\n    ".join(_TEMPLATE_LINES[name] for name in names or FIELDS)
+    return f"""
+You are an expert document analysis assistant. Analyze the following document content and extract comprehensive metadata.
+
+Please provide a detailed analysis in valid JSON format with the following fields:
+
+{{
+    {template}
+}}
+
+Document Content:
+{text}
+
+Important: Return ONLY the JSON object, properly formatted and valid. Do not include any additional text, explanations, or markdown formatting.
+    """
+
+class PromptStats:
+    """
+    Running totals of prompt tokens sent and saved by compaction, across documents
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.documents = 0
+        self.prompt_tokens = 0
+        self.baseline_tokens = 0
+
+    def record(self, prompt_tokens, baseline_tokens):
+        with self._lock:
+            self.documents += 1
+            self.prompt_tokens += prompt_tokens
+            self.baseline_tokens += baseline_tokens
+
+    def stats(self):
+        with self._lock:
+            saved = self.baseline_tokens - self.prompt_tokens
+            return {
+                "documents": self.documents,
+                "prompt_tokens": self.prompt_tokens,
+                "baseline_tokens": self.baseline_tokens,
+                "tokens_saved": saved,
+                "saved_ratio": round(saved / self.baseline_tokens, 3) if self.baseline_tokens else 0.0,
+            }
@@ -0,0 +1,132 @@
+import email.utils
+import logging
+import random
+import threading
+import time
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at a per-minute rate
+    """
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        elapsed = now - self.updated
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated = now
+
+    def reserve(self, amount, now):
+        """
+        Take amount tokens and return how long the caller must wait before using them
+
+        The balance may go negative, which queues later callers behind this one.
+        Callers must hold the owning limiter's lock.
+        """
+        self._refill(now)
+        self.tokens -= amount
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def refund(self, amount):
+        """
+        Return unused tokens (or take extra ones when amount is negative)
+        """
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+class RateLimiter:
+    """
+    Client-side limiter enforcing requests/min and tokens/min quotas across threads
+
+    A value of 0 disables the corresponding quota. When the server answers 429,
+    pause() holds every caller until the cooldown expires so concurrent workers
+    don't keep hammering the API.
+    """
+
+    def __init__(self, requests_per_minute=0, tokens_per_minute=0):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "throttled_seconds": 0.0, "retries": 0, "drops": 0}
+
+    def acquire(self, tokens=0):
+        """
+        Block until a request costing ``tokens`` may be sent; returns seconds waited
+        """
+        with self._lock:
+            now = time.monotonic()
+            wait = max(0.0, self._paused_until - now)
+            if self.requests:
+                wait = max(wait, self.requests.reserve(1, now))
+            if self.tokens and tokens:
+                wait = max(wait, self.tokens.reserve(tokens, now))
+            self._stats["requests"] += 1
+            self._stats["throttled_seconds"] += wait
+
+        if wait > 0:
+            logger.debug(f"Rate limiter throttling request for {wait:.2f}s")
+            time.sleep(wait)
+        return wait
+
+    def pause(self, seconds):
+        """
+        Hold all callers for ``seconds`` (e.g. after a 429 with Retry-After)
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def record_usage(self, estimated_tokens, actual_tokens):
+        """
+        Correct the tokens/min bucket once the real token usage is known
+        """
+        if self.tokens and actual_tokens is not None:
+            with self._lock:
+                self.tokens.refund(estimated_tokens - actual_tokens)
+
+    def record_retry(self):
+        with self._lock:
+            self._stats["retries"] += 1
+
+    def record_drop(self):
+        with self._lock:
+            self._stats["drops"] += 1
+
+    def stats(self):
+        """
+        Return request, throttled time, retry and drop counters
+        """
+        with self._lock:
+            return dict(self._stats)
+
+def parse_retry_after(value):
+    """
+    Parse a Retry-After header given as seconds or an HTTP date; returns seconds or None
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt, base=1.0, cap=60.0, retry_after=None):
+    """
+    Exponential backoff with full jitter, never shorter than the server's Retry-After
+    """
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
@@ -0,0 +1,153 @@
+import os
+import logging
+import queue
+import threading
+import cv2
+import pytesseract
+from PIL import Image
+
+try:
+    import tesserocr
+except (ImportError, ValueError):
+    # ValueError: tesserocr's signal handlers can only be installed from the main
+    # thread, and Streamlit imports the app on a script thread; use the CLI there
+    tesserocr = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# "auto" uses the in-process tesserocr bindings when installed, otherwise the tesseract CLI
+OCR_BACKEND = os.getenv("OCR_BACKEND", "auto")  # "auto", "tesserocr" or "cli"
+
+# Maximum number of loaded Tesseract engines per process (tesserocr backend)
+TESSERACT_POOL_SIZE = int(os.getenv("TESSERACT_POOL_SIZE", os.cpu_count() or 1))
+
+# Columns of word-level OCR data, matching pytesseract.image_to_data
+DATA_KEYS = ("level", "block_num", "par_num", "line_num", "word_num",
+             "left", "top", "width", "height", "conf", "text")
+
+class CLIBackend:
+    """
+    Runs the tesseract executable through pytesseract (one subprocess per call)
+    """
+
+    name = "cli"
+
+    def __init__(self, lang, oem):
+        self.lang = lang
+        self.oem = oem
+
+    def _config(self, psm, variables):
+        config = f"--oem {self.oem} --psm {psm}"
+        for key, value in (variables or {}).items():
+            if value:
+                config += f" -c {key}={value}"
+        return config
+
+    def image_to_string(self, image, psm, variables=None):
+        return pytesseract.image_to_string(image, lang=self.lang, config=self._config(psm, variables))
+
+    def image_to_data(self, image, psm, variables=None):
+        """
+        Word boxes and confidences as pytesseract's DICT output
+        """
+        data = pytesseract.image_to_data(
+            image, lang=self.lang, config=self._config(psm, variables), output_type=pytesseract.Output.DICT
+        )
+        data["conf"] = [float(conf) for conf in data["conf"]]
+        return data
+
+class TesserocrBackend:
+    """
+    Keeps Tesseract engines loaded in-process via the tesserocr C-API bindings
+
+    Engines are created lazily, up to ``size`` of them, and handed out to one
+    thread at a time. Recognition releases the GIL, so a pool sized to the core
+    count runs pages in parallel without paying process start-up or reloading
+    traineddata on every call.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self, lang, oem, size=TESSERACT_POOL_SIZE):
+        self.lang = lang
+        self.oem = oem
+        self.size = max(1, size)
+        self._idle = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                # Count the engine only once it is built, so a failed init doesn't use up a slot
+                api = tesserocr.PyTessBaseAPI(lang=self.lang, oem=self.oem)
+                self._created += 1
+                return api
+        return self._idle.get()
+
+    def _prepare(self, api, image, psm, variables):
+        api.SetPageSegMode(psm)
+        for key, value in (variables or {}).items():
+            api.SetVariable(key, value or "")
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        api.SetImage(Image.fromarray(image))
+
+    def image_to_string(self, image, psm, variables=None):
+        api = self._acquire()
+        try:
+            self._prepare(api, image, psm, variables)
+            return api.GetUTF8Text()
+        finally:
+            api.Clear()
+            self._idle.put(api)
+
+    def image_to_data(self, image, psm, variables=None):
+        """
+        Word boxes and confidences in the same layout as pytesseract's DICT output
+        """
+        api = self._acquire()
+        try:
+            self._prepare(api, image, psm, variables)
+            api.Recognize()
+            data = {key: [] for key in DATA_KEYS}
+            block_num = par_num = line_num = word_num = 0
+            level = tesserocr.RIL.WORD
+            for word in tesserocr.iterate_level(api.GetIterator(), level):
+                # GetUTF8Text raises rather than returning None for a word without text
+                if word.Empty(level):
+                    continue
+                text = word.GetUTF8Text(level)
+                if word.IsAtBeginningOf(tesserocr.RIL.BLOCK):
+                    block_num, par_num, line_num, word_num = block_num + 1, 0, 0, 0
+                if word.IsAtBeginningOf(tesserocr.RIL.PARA):
+                    par_num, line_num, word_num = par_num + 1, 0, 0
+                if word.IsAtBeginningOf(tesserocr.RIL.TEXTLINE):
+                    line_num, word_num = line_num + 1, 0
+                word_num += 1
+                left, top, right, bottom = word.BoundingBox(level)
+                row = (5, block_num, par_num, line_num, word_num,
+                       left, top, right - left, bottom - top, word.Confidence(level), text)
+                for key, value in zip(DATA_KEYS, row):
+                    data[key].append(value)
+            return data
+        finally:
+            api.Clear()
+            self._idle.put(api)
+
+def create_backend(lang, oem, kind=None):
+    """
+    Build the configured Tesseract backend, falling back to the CLI when tesserocr is missing
+    """
+    kind = kind or OCR_BACKEND
+    if kind in ("auto", "tesserocr") and tesserocr is not None:
+        return TesserocrBackend(lang, oem)
+    if kind == "tesserocr":
+        logger.warning("tesserocr is not installed; falling back to the tesseract CLI")
+    return CLIBackend(lang, oem)
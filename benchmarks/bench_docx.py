@@ -0,0 +1,128 @@
+"""
+Benchmark streaming DOCX extraction against the python-docx object tree
+
+Usage:
+    python -m benchmarks.bench_docx [file.docx ...] [--rows 5000] [--cols 6]
+
+Without files, a synthetic document with --rows table rows is generated. Each
+extractor runs in a fresh process so peak memory (max RSS) is comparable.
+"""
+import os
+import sys
+import argparse
+import io
+import multiprocessing
+import tempfile
+import time
+import zipfile
+from xml.sax.saxutils import escape
+
+import docx
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.extractor import extract_text_from_docx
+
+def legacy_docx_text(path):
+    """
+    Former extractor.extract_text_from_docx: python-docx paragraphs, then row.cells of every table
+    """
+    doc = docx.Document(path)
+    paragraphs = [para.text.strip() for para in doc.paragraphs if para.text.strip()]
+    tables_text = []
+    for table in doc.tables:
+        for row in table.rows:
+            row_text = [cell.text.strip() for cell in row.cells if cell.text.strip()]
+            if row_text:
+                tables_text.append(" | ".join(row_text))
+    all_text = list(paragraphs)
+    if tables_text:
+        all_text.append("\n[Tables Content]\n")
+        all_text.extend(tables_text)
+    result = "\n".join(all_text)
+    return result if result.strip() else "No text could be extracted from this DOCX file."
+
+def make_table_docx(path, rows, cols):
+    """
+    Write a DOCX with a few paragraphs and one rows x cols table, every 10th row spanning two columns
+    """
+    template = io.BytesIO()
+    docx.Document().save(template)
+
+    body = ["<w:p><w:r><w:t>Quarterly inventory report</w:t></w:r></w:p>"]
+    body.append("<w:tbl>")
+    for i in range(rows):
+        body.append("<w:tr>")
+        j = 0
+        while j < cols:
+            text = escape(f"Item {i} / field {j}")
+            if i % 10 == 0 and j + 1 < cols:
+                body.append(f'<w:tc><w:tcPr><w:gridSpan w:val="2"/></w:tcPr><w:p><w:r><w:t>{text}</w:t></w:r></w:p></w:tc>')
+                j += 2
+            else:
+                body.append(f"<w:tc><w:p><w:r><w:t>{text}</w:t></w:r></w:p></w:tc>")
+                j += 1
+        body.append("</w:tr>")
+    body.append("</w:tbl>")
+    body.append("<w:p><w:r><w:t>End of report</w:t></w:r></w:p>")
+
+    document_xml = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f"<w:body>{''.join(body)}<w:sectPr/></w:body></w:document>"
+    )
+    with zipfile.ZipFile(template) as source, zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as target:
+        for item in source.infolist():
+            if item.filename == "word/document.xml":
+                target.writestr(item, document_xml)
+            else:
+                target.writestr(item, source.read(item))
+
+def _measure(extractor, path, results):
+    start = time.perf_counter()
+    text = extractor(path)
+    seconds = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 if resource else None
+    results.put((seconds, peak_mb, text))
+
+def measure(extractor, path):
+    """
+    Run one extractor in a fresh process; returns (seconds, peak RSS in MB or None, text)
+    """
+    results = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_measure, args=(extractor, path, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("files", nargs="*", help="DOCX files (default: a generated table-heavy document)")
+    parser.add_argument("--rows", type=int, default=5000, help="Table rows in the generated document (default: 5000)")
+    parser.add_argument("--cols", type=int, default=6, help="Table columns in the generated document (default: 6)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        paths = args.files
+        if not paths:
+            path = os.path.join(temp_dir, f"table_{args.rows}x{args.cols}.docx")
+            make_table_docx(path, args.rows, args.cols)
+            paths = [path]
+
+        print(f"{'file':<28}{'extractor':<12}{'seconds':>9}{'peak MB':>9}{'same output':>13}")
+        for path in paths:
+            legacy = measure(legacy_docx_text, path)
+            streaming = measure(extract_text_from_docx, path)
+            same = "yes" if legacy[2] == streaming[2] else "NO"
+            for name, (seconds, peak_mb, _) in (("python-docx", legacy), ("streaming", streaming)):
+                peak = f"{peak_mb:.0f}" if peak_mb is not None else "n/a"
+                print(f"{os.path.basename(path)[:27]:<28}{name:<12}{seconds:>9.2f}{peak:>9}{same:>13}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark the unified OCR engine against the two legacy scanned-PDF OCR paths
+
+Usage:
+    python -m benchmarks.bench_ocr_paths path/to/file.pdf [--pages 5] [--reference ref.txt]
+
+Accuracy is the word-level similarity between OCR output and a reference text:
+the page's own text layer for digital PDFs, or --reference for true scans.
+"""
+import os
+import sys
+import argparse
+import difflib
+import io
+import tempfile
+import time
+
+import cv2
+import fitz  # PyMuPDF
+import pytesseract
+from PIL import Image
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.ocr import OCR_LANG, OCR_OEM, OCR_PSM, OCREngine, get_ocr_engine, preprocess_image
+
+# Whitelist the legacy scanned-PDF path used (ASCII only: no quotes, apostrophes or accents)
+LEGACY_CHAR_WHITELIST = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz!@#$%^&*()_+-=[]{}|;:,.<>?/~"
+LEGACY_CONFIG = f"--oem {OCR_OEM} --psm {OCR_PSM} -c tessedit_char_whitelist={LEGACY_CHAR_WHITELIST}"
+
+try:
+    from pdf2image import convert_from_path
+except ImportError:
+    convert_from_path = None
+
+def word_similarity(text, reference):
+    """
+    Word-level similarity ratio between two texts (1.0 = identical)
+    """
+    a = text.lower().split()
+    b = reference.lower().split()
+    if not b:
+        return None
+    return difflib.SequenceMatcher(None, a, b, autojunk=False).ratio()
+
+def legacy_extractor_path(pdf_path, page_number, dpi):
+    """
+    Former extractor.extract_text_from_pdf OCR: PyMuPDF PNG render, raw Tesseract
+    """
+    with fitz.open(pdf_path) as doc:
+        pix = doc[page_number - 1].get_pixmap(dpi=dpi)
+        img = Image.open(io.BytesIO(pix.tobytes("png")))
+        return pytesseract.image_to_string(img, lang=OCR_LANG)
+
+def legacy_pdf2image_path(pdf_path, page_number, dpi):
+    """
+    Former ocr.ocr_scanned_pdf: poppler render, PNG round trip, preprocess + whitelist config
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        images = convert_from_path(pdf_path, dpi=dpi, first_page=page_number, last_page=page_number)
+        img_path = os.path.join(temp_dir, "page.png")
+        images[0].save(img_path, "PNG")
+        processed = preprocess_image(cv2.imread(img_path))
+        return pytesseract.image_to_string(processed, lang=OCR_LANG, config=LEGACY_CONFIG)
+
+def engine_path(pdf_path, page_number, dpi):
+    """
+    Unified OCREngine: in-memory PyMuPDF grayscale render, shared preprocessing chain
+    """
+    with fitz.open(pdf_path) as doc:
+        return get_ocr_engine().ocr_page(doc[page_number - 1], dpi=dpi)
+
+_whitelist_engine = None
+
+def engine_whitelist_path(pdf_path, page_number, dpi):
+    """
+    Unified OCREngine restricted to the legacy ASCII whitelist
+    """
+    global _whitelist_engine
+    if _whitelist_engine is None:
+        _whitelist_engine = OCREngine(whitelist=LEGACY_CHAR_WHITELIST)
+    with fitz.open(pdf_path) as doc:
+        return _whitelist_engine.ocr_page(doc[page_number - 1], dpi=dpi)
+
+def tesseract_cli_available():
+    try:
+        pytesseract.get_tesseract_version()
+        return True
+    except Exception:
+        return False
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("pdf", help="PDF to benchmark")
+    parser.add_argument("--pages", type=int, default=5, help="Number of pages to OCR (default: 5)")
+    parser.add_argument("--dpi", type=int, default=300, help="Render resolution (default: 300)")
+    parser.add_argument("--reference", help="Reference text file used for accuracy instead of the text layer")
+    args = parser.parse_args(argv)
+
+    with fitz.open(args.pdf) as doc:
+        page_numbers = list(range(1, min(args.pages, len(doc)) + 1))
+        references = [doc[n - 1].get_text() for n in page_numbers]
+    if args.reference:
+        with open(args.reference, "r", encoding="utf-8") as f:
+            references = [f.read()]
+
+    paths = []
+    if tesseract_cli_available():
+        paths.append(("extractor (legacy)", legacy_extractor_path))
+        if convert_from_path:
+            paths.append(("pdf2image (legacy)", legacy_pdf2image_path))
+        else:
+            print("pdf2image not installed; skipping the legacy poppler path")
+    else:
+        print("tesseract executable not found; skipping the legacy paths")
+    paths.append(("OCREngine (ASCII wl)", engine_whitelist_path))
+    paths.append(("OCREngine", engine_path))
+
+    print(f"{'path':<22}{'ms/page':>10}{'accuracy':>10}")
+    for name, ocr in paths:
+        outputs = []
+        start = time.perf_counter()
+        for page_number in page_numbers:
+            outputs.append(ocr(args.pdf, page_number, args.dpi))
+        ms_per_page = (time.perf_counter() - start) * 1000 / len(page_numbers)
+
+        if args.reference:
+            scores = [word_similarity("\n".join(outputs), references[0])]
+        else:
+            scores = [word_similarity(out, ref) for out, ref in zip(outputs, references)]
+        scores = [score for score in scores if score is not None]
+        accuracy = f"{sum(scores) / len(scores):.3f}" if scores else "n/a"
+        print(f"{name:<22}{ms_per_page:>10.0f}{accuracy:>10}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark page-parallel PDF text-layer extraction across worker counts
+
+Usage:
+    python -m benchmarks.bench_pdf_text [file.pdf] [--pages 3000] [--workers 1 2 4] [--chunk 100]
+
+Without a file, a synthetic text-only PDF with --pages pages is generated.
+Reports pages/second per worker count and checks the output matches serial.
+"""
+import os
+import sys
+import argparse
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.extractor import PDF_PAGE_CHUNK, iter_pdf_chunks, join_chunks
+
+def make_text_pdf(path, pages):
+    """
+    Write a catalogue-style PDF with 40 lines of text per page
+    """
+    with fitz.open() as doc:
+        for i in range(pages):
+            page = doc.new_page()
+            for j in range(40):
+                page.insert_text((40, 40 + j * 18), f"Item {i}-{j}: part number {i * 100 + j}, catalogue description text")
+        doc.save(path)
+
+def main(argv=None):
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("pdf", nargs="?", help="PDF to read (default: a generated text-only PDF)")
+    parser.add_argument("--pages", type=int, default=3000, help="Pages in the generated PDF (default: 3000)")
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, 2, cpus}), help="Worker counts to compare")
+    parser.add_argument("--chunk", type=int, default=PDF_PAGE_CHUNK, help=f"Pages per worker task (default: {PDF_PAGE_CHUNK})")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = args.pdf
+        if not path:
+            path = os.path.join(temp_dir, "catalogue.pdf")
+            make_text_pdf(path, args.pages)
+        with fitz.open(path) as doc:
+            page_count = len(doc)
+
+        print(f"{page_count} pages, {cpus} CPU(s)")
+        print(f"{'workers':>8}{'seconds':>10}{'pages/s':>10}{'same output':>13}")
+        serial = None
+        for workers in args.workers:
+            start = time.perf_counter()
+            text = join_chunks(iter_pdf_chunks(path, workers=workers, chunk_pages=args.chunk), ".pdf")
+            seconds = time.perf_counter() - start
+            serial = text if serial is None else serial
+            same = "yes" if text == serial else "NO"
+            print(f"{workers:>8}{seconds:>10.2f}{page_count / seconds:>10.0f}{same:>13}")
+
+if __name__ == "__main__":
+    main()
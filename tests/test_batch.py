@@ -0,0 +1,26 @@
+import json
+
+from backend.batch import Checkpoint, read_recorded, run_batch
+
+def test_read_recorded_drops_partial_last_line(tmp_path):
+    output = tmp_path / "out.jsonl"
+    output.write_text(json.dumps({"path": "/a.txt", "status": "ok"}) + "\n" + '{"path": "/b.txt", "sta')
+    assert read_recorded(str(output)) == {"/a.txt": "ok"}
+    assert output.read_text().endswith("\n")
+
+def test_resume_skips_files_already_written(tmp_path, monkeypatch):
+    monkeypatch.setattr("backend.batch.get_duplicate_index", lambda: None)
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    for number in range(3):
+        (docs / f"d{number}.txt").write_text(f"Document {number} about quarterly revenue in the northern region.")
+    output = tmp_path / "out.jsonl"
+    checkpoint_path = str(tmp_path / "checkpoint.db")
+
+    run_batch(str(docs), str(output), checkpoint_path, extract_workers=1, llm_workers=1, offline=True)
+    # A crash after writing the records but before checkpointing them
+    Checkpoint(checkpoint_path)._conn.execute("DELETE FROM files").connection.commit()
+    summary = run_batch(str(docs), str(output), checkpoint_path, extract_workers=1, llm_workers=1, offline=True)
+
+    assert summary["processed"] == 0
+    assert len(output.read_text().splitlines()) == 3
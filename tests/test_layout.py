@@ -0,0 +1,27 @@
+import cv2
+import numpy as np
+
+from backend.layout import _overlaps, detect_text_regions, merge_overlapping
+
+def page_with_nested_blocks():
+    """
+    An L-shaped block whose bounding rect contains a second, separate block of text
+    """
+    page = np.full((400, 600), 255, dtype=np.uint8)
+    cv2.line(page, (20, 20), (500, 20), 0, 3)
+    cv2.line(page, (20, 20), (20, 350), 0, 3)
+    cv2.putText(page, "Total due", (200, 200), cv2.FONT_HERSHEY_SIMPLEX, 1.0, 0, 2)
+    return page
+
+def test_merge_overlapping_takes_the_union():
+    boxes = [(0, 0, 100, 50), (80, 40, 100, 50), (300, 300, 20, 20)]
+    assert sorted(merge_overlapping(boxes)) == [(0, 0, 180, 90), (300, 300, 20, 20)]
+
+def test_merge_overlapping_follows_chains():
+    boxes = [(0, 0, 10, 10), (20, 0, 10, 10), (5, 0, 20, 10)]
+    assert merge_overlapping(boxes) == [(0, 0, 30, 10)]
+
+def test_detected_regions_do_not_overlap():
+    boxes = [region["box"] for region in detect_text_regions(page_with_nested_blocks())]
+    assert len(boxes) == 1
+    assert not any(_overlaps(a, b) for i, a in enumerate(boxes) for b in boxes[i + 1:])
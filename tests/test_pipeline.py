@@ -0,0 +1,41 @@
+import pytest
+
+from backend import pipeline
+from backend.dedup import DuplicateIndex
+from backend.metadata_schema import DocumentMetadata
+
+TEXT = "Quarterly revenue grew in every region while operating costs stayed flat across the year."
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    index = DuplicateIndex(str(tmp_path / "dedup.db"))
+    monkeypatch.setattr(pipeline, "get_duplicate_index", lambda: index)
+    return index
+
+@pytest.fixture
+def model_calls(monkeypatch):
+    calls = []
+
+    def generate_metadata(text, offline=None):
+        calls.append(text)
+        return DocumentMetadata(title="Quarterly report", summary="Revenue grew.")
+
+    monkeypatch.setattr(pipeline, "generate_metadata", generate_metadata)
+    return calls
+
+def test_exact_duplicate_is_flagged(index, model_calls, monkeypatch):
+    monkeypatch.setattr(pipeline, "DEDUP_MODE", "flag")
+    first = pipeline.describe_text(TEXT, offline=False)
+    second = pipeline.describe_text(TEXT, offline=False)
+    assert "near_duplicate" not in first
+    assert second["near_duplicate"]["document_id"] == first["document_id"]
+    assert second["near_duplicate"]["similarity"] == 1.0
+    assert not second["near_duplicate"]["reused"]
+
+def test_exact_duplicate_reuses_metadata(index, model_calls, monkeypatch):
+    monkeypatch.setattr(pipeline, "DEDUP_MODE", "reuse")
+    pipeline.describe_text(TEXT, offline=False)
+    second = pipeline.describe_text(TEXT, offline=False)
+    assert len(model_calls) == 1
+    assert second["near_duplicate"]["reused"]
+    assert second["metadata"]["title"] == "Quarterly report"
@@ -0,0 +1,33 @@
+from backend.prompt import compact_text
+
+def paginated(pages):
+    return "\n".join(f"--- Page {number} ---\n{body}" for number, body in enumerate(pages, 1))
+
+def test_running_headers_and_page_numbers_are_dropped():
+    text = paginated(
+        f"ACME Corp Confidential\nAnnual Report - p. {n}\nFindings for region {chr(64 + n)}.\nMore discussion here.\n{n}"
+        for n in range(1, 7)
+    )
+    compacted = compact_text(text).splitlines()
+    assert compacted.count("ACME Corp Confidential") == 1
+    assert sum(line.startswith("Annual Report - p.") for line in compacted) == 1
+    assert all(f"Findings for region {chr(64 + n)}." in compacted for n in range(1, 7))
+    assert not any(line.isdigit() for line in compacted)
+
+def test_numbered_section_headings_survive():
+    pages = []
+    for n in range(1, 7):
+        heading = f"Chapter {n // 2 + 1}\n" if n % 2 else ""
+        pages.append(f"Report header\n{heading}Body text of page {n}.\nSection {n}.1 Results\nAnalysis continues.\nClosing paragraph.")
+    compacted = compact_text(paginated(pages)).splitlines()
+    assert [line for line in compacted if line.startswith("Chapter")] == ["Chapter 1", "Chapter 2", "Chapter 3"]
+    assert [line for line in compacted if line.startswith("Section")] == [f"Section {n}.1 Results" for n in range(1, 7)]
+
+def test_headings_in_unpaginated_text_survive():
+    text = "Chapter 1\nIntroduction.\nChapter 2\nMethods.\nChapter 3\nResults.\nChapter 4\nDiscussion."
+    assert compact_text(text) == text
+
+def test_table_values_on_their_own_lines_survive():
+    text = paginated(["Invoice\nAmount\n1200\n350\n1550\nTotal due", "Notes\nPaid in full."])
+    compacted = compact_text(text).splitlines()
+    assert ["1200", "350", "1550"] == [line for line in compacted if line.isdigit()]
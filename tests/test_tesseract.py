@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from backend.ocr import OCR_LANG, OCR_OEM, OCREngine
+from backend.tesseract import DATA_KEYS, TesserocrBackend, tesserocr
+
+pytestmark = pytest.mark.skipif(tesserocr is None, reason="tesserocr is not installed")
+
+@pytest.fixture(scope="module")
+def backend():
+    backend = TesserocrBackend(OCR_LANG, OCR_OEM, size=1)
+    try:
+        backend._idle.put(backend._acquire())
+    except RuntimeError as e:
+        pytest.skip(f"Tesseract could not be initialised: {e}")
+    return backend
+
+def blank(height=200, width=300):
+    return np.full((height, width), 255, dtype=np.uint8)
+
+class WeakFirstPass:
+    """
+    Reports one low-confidence word over a blank area, then defers to the real backend
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.calls = 0
+
+    def image_to_data(self, image, psm, variables=None):
+        self.calls += 1
+        if self.calls > 1:
+            return self.backend.image_to_data(image, psm, variables)
+        row = (5, 1, 1, 1, 1, 20, 20, 120, 40, 10.0, "smudge")
+        return {key: [value] for key, value in zip(DATA_KEYS, row)}
+
+def test_blank_image_has_no_words(backend):
+    data = backend.image_to_data(blank(), 6)
+    assert data == {key: [] for key in DATA_KEYS}
+
+def test_blank_image_recognizes_as_empty(backend):
+    engine = OCREngine(backend=backend, preprocessors=[], regions=False)
+    assert engine.recognize(blank()) == ""
+
+def test_empty_retry_crop_keeps_the_page(backend):
+    weak = WeakFirstPass(backend)
+    engine = OCREngine(backend=weak, preprocessors=[], regions=False)
+    result = engine.recognize_data(blank())
+    assert weak.calls > 1
+    assert result["text"] == "smudge"